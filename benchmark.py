@@ -0,0 +1,311 @@
+"""Benchmark do pipeline de varredura, cópia e detecção de duplicados.
+
+Cria árvores sintéticas em uma pasta temporária, executa o FileProcessor em
+cada modo de operação e mede arquivos/s, MB/s, chamadas de leitura/escrita
+por arquivo e pico de memória. Cada caso roda em um processo separado para
+que o pico de memória seja medido de forma isolada.
+
+Com --startup, mede a abertura da interface: o tempo até a janela principal
+ser exibida em um processo novo, comparado a uma meta, e quais módulos
+pesados foram carregados antes do primeiro uso.
+
+Exemplo:
+    python benchmark.py --scale 0.5 --workers 1 4 --json resultado.json
+    python benchmark.py --startup --startup-target 1.5
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import statistics
+import subprocess
+import platform
+import tempfile
+import multiprocessing
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # indisponível no Windows
+    resource = None
+
+from deduplicador import DEDUPE_MODES
+
+SCENARIOS = ('tiny', 'huge', 'deep', 'collisions', 'duplicates')
+MODES = ('copy', 'move', 'hardlink')
+
+# Meta de abertura da interface, em segundos, do início do processo até a janela exibida
+STARTUP_TARGET = 1.5
+
+# Módulos que a interface só deve carregar no primeiro uso
+LAZY_MODULES = ('psutil', 'processador', 'observador', 'planejador', 'deduplicador', 'sqlite3')
+
+# Executado em um processo novo: abre a janela como o main.py e informa o tempo e os módulos carregados
+_STARTUP_SCRIPT = """
+import sys, json, time
+start = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+from interface import MainWindow
+window = MainWindow()
+window.show()
+app.processEvents()
+print(json.dumps({'window': time.perf_counter() - start,
+                  'loaded': [name for name in %r if name in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def _write(path: str, size: int, rng: random.Random, content: Optional[bytes] = None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        if content is not None:
+            f.write(content)
+            return
+        remaining = size
+        block = rng.randbytes(min(size, 1024 * 1024)) if size else b""
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
+
+
+def build_tree(scenario: str, root: str, scale: float, seed: int = 42) -> Dict[str, str]:
+    """Cria a árvore sintética do cenário e retorna as pastas de origem e modelo."""
+    rng = random.Random(seed)
+    source = os.path.join(root, "origem")
+    model = None
+
+    if scenario == 'tiny':
+        # Muitos arquivos pequenos espalhados em poucas pastas
+        for i in range(int(5000 * scale)):
+            _write(os.path.join(source, f"pasta_{i % 50}", f"arquivo_{i}.txt"), 1024, rng)
+    elif scenario == 'huge':
+        # Poucos arquivos grandes
+        for i in range(3):
+            _write(os.path.join(source, f"video_{i}.bin"), int(64 * 1024 * 1024 * scale), rng)
+    elif scenario == 'deep':
+        # Aninhamento profundo, com um arquivo em cada nível
+        path = source
+        for level in range(int(200 * scale)):
+            path = os.path.join(path, f"nivel_{level % 10}")
+            _write(os.path.join(path, f"arquivo_{level}.dat"), 4096, rng)
+    elif scenario == 'collisions':
+        # Muitos arquivos com o mesmo nome roteados para a mesma pasta do modelo
+        model = os.path.join(root, "modelo")
+        os.makedirs(os.path.join(model, "Fotos"))
+        _write(os.path.join(model, "Fotos", "exemplo.jpg"), 0, rng)
+        for i in range(int(2000 * scale)):
+            _write(os.path.join(source, f"camera_{i}", "IMG_0001.jpg"), 2048, rng)
+    elif scenario == 'duplicates':
+        # Conjuntos de conteúdo repetido sob nomes e pastas diferentes
+        for group in range(int(100 * scale)):
+            content = rng.randbytes(256 * 1024)
+            for copy in range(10):
+                _write(os.path.join(source, f"album_{copy}", f"foto_{group}.jpg"), 0, rng, content)
+    else:
+        raise ValueError(f"Cenário desconhecido: {scenario}")
+
+    return {'source': source, 'model': model}
+
+
+def _io_counters() -> Optional[Dict[str, int]]:
+    """Lê os contadores de E/S do processo atual (somente Linux)."""
+    try:
+        with open("/proc/self/io") as f:
+            return {key: int(value) for key, value in (line.split(": ") for line in f)}
+    except OSError:
+        return None
+
+
+def _peak_rss() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está em KiB no Linux e em bytes no macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_case(scenario: str, mode: str, workers: int, scale: float, rerun: bool, dedupe: Optional[str], conn):
+    """Executa um caso em um processo filho e envia as métricas pela conexão."""
+    import processador
+
+    work_dir = tempfile.mkdtemp(prefix="organizador_bench_")
+    try:
+        # Mantém logs, índices e manifestos do benchmark fora da pasta do usuário
+        processador.LOG_DIR = os.path.join(work_dir, "logs")
+        tree = build_tree(scenario, work_dir, scale)
+        destination = os.path.join(work_dir, "destino")
+        total_bytes = sum(os.path.getsize(os.path.join(r, f))
+                          for r, _, files in os.walk(tree['source']) for f in files)
+
+        processor = processador.FileProcessor(mode=mode, dedupe=dedupe)
+        if rerun:
+            # Mede a segunda passada, em que o destino já contém os arquivos
+            for _ in processor.process_entries(processor.scan_files([tree['source']], destination),
+                                               tree['model'], destination, workers=workers):
+                pass
+
+        io_before = _io_counters()
+        start = time.perf_counter()
+        for _ in processor.process_entries(processor.scan_files([tree['source']], destination),
+                                           tree['model'], destination, workers=workers):
+            pass
+        elapsed = time.perf_counter() - start
+        io_after = _io_counters()
+        processor.close()
+
+        files = sum(processor.run_summary['status'].values())
+        syscalls = None
+        if io_before and io_after and files:
+            syscalls = ((io_after['syscr'] - io_before['syscr'])
+                        + (io_after['syscw'] - io_before['syscw'])) / files
+
+        conn.send({
+            'scenario': scenario,
+            'mode': mode,
+            'workers': workers,
+            'rerun': rerun,
+            'dedupe': dedupe,
+            'files': files,
+            'bytes': total_bytes,
+            'elapsed_s': round(elapsed, 4),
+            'files_per_s': round(files / elapsed, 1) if elapsed else None,
+            'mb_per_s': round(total_bytes / (1024 * 1024) / elapsed, 2) if elapsed else None,
+            'rw_syscalls_per_file': round(syscalls, 2) if syscalls is not None else None,
+            'bytes_written': processor.metrics.snapshot()['counters'].get('bytes_written', 0),
+            'peak_rss_bytes': _peak_rss(),
+            'status': processor.run_summary['status']
+        })
+    except Exception as e:
+        conn.send({'scenario': scenario, 'mode': mode, 'workers': workers, 'error': str(e)})
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        conn.close()
+
+
+def run_case(scenario: str, mode: str, workers: int, scale: float, rerun: bool = False,
+             dedupe: Optional[str] = None) -> Dict[str, Any]:
+    """Executa um caso do benchmark em um processo isolado."""
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_run_case, args=(scenario, mode, workers, scale, rerun, dedupe,
+                                                                    child_conn))
+    process.start()
+    child_conn.close()
+    try:
+        result = parent_conn.recv()
+    except EOFError:
+        result = {'scenario': scenario, 'mode': mode, 'workers': workers,
+                  'error': f"processo terminou com código {process.exitcode}"}
+    process.join()
+    return result
+
+
+def measure_startup(runs: int = 5) -> Dict[str, Any]:
+    """Abre a interface `runs` vezes em processos novos e retorna as medianas dos tempos."""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    totals, windows, loaded = [], [], set()
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT], env=env, capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+        elapsed = time.perf_counter() - start
+        if completed.returncode != 0:
+            return {'error': completed.stderr.strip().splitlines()[-1] if completed.stderr.strip()
+                    else f"processo terminou com código {completed.returncode}"}
+        data = json.loads(completed.stdout.strip().splitlines()[-1])
+        # O processo termina logo após exibir a janela; o total inclui a inicialização do Python
+        totals.append(elapsed)
+        windows.append(data['window'])
+        loaded.update(data['loaded'])
+    return {
+        'runs': runs,
+        'total_s': round(statistics.median(totals), 3),
+        'window_s': round(statistics.median(windows), 3),
+        'eager_modules': sorted(loaded)
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark do organizador de arquivos.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplica a quantidade e o tamanho dos arquivos")
+    parser.add_argument("--rerun", action="store_true", help="mede também a segunda passada sobre o mesmo destino")
+    parser.add_argument("--dedupe", choices=DEDUPE_MODES, default=None,
+                        help="ativa a deduplicação global entre as origens")
+    parser.add_argument("--json", dest="json_path", help="grava os resultados em JSON neste arquivo")
+    parser.add_argument("--startup", action="store_true",
+                        help="mede a abertura da interface em vez do processamento")
+    parser.add_argument("--startup-target", type=float, default=STARTUP_TARGET,
+                        help="tempo máximo de abertura aceito, em segundos")
+    parser.add_argument("--startup-runs", type=int, default=5, help="quantidade de aberturas medidas")
+    return parser
+
+
+def check_startup(args: argparse.Namespace) -> int:
+    """Mede a abertura da interface; falha se passar da meta ou carregar módulos pesados cedo."""
+    result = measure_startup(args.startup_runs)
+    if 'error' in result:
+        print(f"ERRO: {result['error']}", file=sys.stderr)
+        return 1
+    result['target_s'] = args.startup_target
+    result['ok'] = result['total_s'] <= args.startup_target and not result['eager_modules']
+    print(f"Abertura: {result['total_s']:.3f}s (janela em {result['window_s']:.3f}s), "
+          f"meta {args.startup_target:.3f}s", file=sys.stderr)
+    if result['eager_modules']:
+        print(f"Carregados antes do primeiro uso: {', '.join(result['eager_modules'])}", file=sys.stderr)
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0 if result['ok'] else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.startup:
+        return check_startup(args)
+    results = []
+    for scenario in args.scenarios:
+        for mode in args.modes:
+            for workers in args.workers:
+                # No modo move a origem é esvaziada, então não há segunda passada
+                reruns = (False, True) if args.rerun and mode != 'move' else (False,)
+                for rerun in reruns:
+                    result = run_case(scenario, mode, workers, args.scale, rerun, args.dedupe)
+                    results.append(result)
+                    if 'error' in result:
+                        print(f"{scenario:<11} {mode:<9} w={workers:<3} ERRO: {result['error']}", file=sys.stderr)
+                        continue
+                    print(f"{scenario:<11} {mode:<9} w={workers:<3}{' rerun' if rerun else '      '} "
+                          f"{result['files']:>7} arq  {result['files_per_s'] or 0:>10.1f} arq/s  "
+                          f"{result['mb_per_s'] or 0:>9.2f} MB/s  "
+                          f"{result['bytes_written'] / (1024 * 1024):>8.1f} MB grav  "
+                          f"{result['rw_syscalls_per_file'] if result['rw_syscalls_per_file'] is not None else '-':>7} sysc/arq  "
+                          f"{(result['peak_rss_bytes'] or 0) / (1024 * 1024):>7.1f} MiB", file=sys.stderr)
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': args.scale,
+        'results': results
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 1 if any('error' in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
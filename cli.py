@@ -0,0 +1,305 @@
+"""Execução em linha de comando do organizador, sem interface gráfica.
+
+Os eventos são escritos na saída padrão como linhas JSON, um objeto por
+linha, para que possam ser consumidos por outros programas.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+from typing import List, Optional
+
+from comparador import HASH_ALGORITHMS
+from deduplicador import DEDUPE_MODES
+from manifesto import RunManifest
+from observador import FolderWatcher
+from planejador import RunPlan, build_plan
+from processador import FileProcessor, LOG_DIR, MODES
+
+# Multiplicadores aceitos nos limites de vazão, como em 10M
+_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+_emit_lock = threading.Lock()
+
+# Códigos de saída
+EXIT_OK = 0
+EXIT_FATAL = 1
+EXIT_USAGE = 2
+EXIT_ERRORS = 3
+EXIT_SKIPPED = 4
+EXIT_INTERRUPTED = 130
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Monta o parser de argumentos da linha de comando."""
+    parser = argparse.ArgumentParser(
+        prog="organizador",
+        description="Organiza arquivos das pastas de origem na pasta de destino.",
+        epilog=(f"Códigos de saída: {EXIT_OK} sucesso, {EXIT_FATAL} erro fatal, {EXIT_USAGE} uso incorreto, "
+                f"{EXIT_ERRORS} arquivos com erro, {EXIT_SKIPPED} arquivos duplicados ignorados, "
+                f"{EXIT_INTERRUPTED} interrompido.")
+    )
+    parser.add_argument("sources", nargs="*", help="pastas de origem")
+    parser.add_argument("-d", "--destination", help="pasta de destino")
+    parser.add_argument("-m", "--model", default=None, help="pasta modelo")
+    parser.add_argument("--mode", choices=MODES, default="copy", help="operação realizada (padrão: copy)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="número de trabalhadores (padrão: 1)")
+    parser.add_argument("--processes", action="store_true", help="usa processos em vez de threads")
+    parser.add_argument("--incremental", action="store_true", help="ignora arquivos inalterados desde a última execução")
+    parser.add_argument("--dedupe", choices=DEDUPE_MODES, default=None,
+                        help="grava uma única vez cada conteúdo repetido entre as origens; as demais cópias "
+                             "viram hardlinks ou reflinks")
+    parser.add_argument("--max-rate", type=parse_rate, default=0, metavar="BYTES",
+                        help="limite de bytes por segundo, aceita K, M e G (padrão: sem limite)")
+    parser.add_argument("--max-files-rate", type=float, default=0, metavar="N",
+                        help="limite de arquivos por segundo (padrão: sem limite)")
+    parser.add_argument("--busy-threshold", type=float, default=0, metavar="PCT",
+                        help="reduz a vazão quando a ocupação do disco passa deste percentual, por exemplo 90 "
+                             "(padrão: desativado)")
+    parser.add_argument("--control-stdin", action="store_true",
+                        help="lê comandos JSON da entrada padrão para alterar os limites durante a execução")
+    parser.add_argument("--hash", choices=sorted(HASH_ALGORITHMS), default="sha256", help="algoritmo de hash")
+    parser.add_argument("--no-hash-index", action="store_true", help="não usa o índice persistente de hashes")
+    parser.add_argument("--profile", action="store_true",
+                        help="grava um perfil cProfile do processamento na pasta de logs")
+    parser.add_argument("--resume", nargs="?", const="", metavar="DIARIO",
+                        help="retoma o trabalho interrompido mais recente, ou o do diário informado")
+    parser.add_argument("--no-journal", action="store_true", help="não grava o diário do trabalho")
+    parser.add_argument("--watch", action="store_true",
+                        help="modo de vigília: continua observando as origens até ser interrompido")
+    parser.add_argument("--debounce", type=float, default=2.0,
+                        help="segundos sem alterações antes de processar um arquivo no modo de vigília (padrão: 2)")
+    parser.add_argument("--reconcile-interval", type=float, default=3600.0,
+                        help="segundos entre as varreduras de reconciliação no modo de vigília; 0 desativa "
+                             "(padrão: 3600)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="apenas simula: calcula o plano, o espaço necessário e o tempo estimado")
+    parser.add_argument("--plan-out", metavar="PLANO", help="grava o plano da simulação neste arquivo JSONL")
+    parser.add_argument("--plan", metavar="PLANO", help="executa um plano gravado, sem varrer as origens; o modo, o incremental, "
+                             "a deduplicação e o hash gravados no plano prevalecem")
+    parser.add_argument("--log-json", action="store_true", help="grava o log em formato JSONL")
+    parser.add_argument("--summary-only", action="store_true", help="emite apenas o resumo final")
+    return parser
+
+
+def parse_rate(value: str) -> float:
+    """Converte um limite como 500K ou 10M em bytes por segundo."""
+    text = value.strip().upper().rstrip("B")
+    unit = text[-1:] if text[-1:] in _UNITS else ""
+    try:
+        return float(text[:len(text) - len(unit)]) * _UNITS[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"limite inválido: {value}") from None
+
+
+def _dedupe_progress(stage: str, done: int, total: int):
+    """Informa o progresso da leitura da deduplicação, que acontece antes dos eventos 'file'."""
+    emit("dedupe_progress", stage=stage, done=done, total=total)
+
+
+def emit(event: str, **data):
+    """Escreve um evento como uma linha JSON na saída padrão."""
+    line = json.dumps({'event': event, **data}, ensure_ascii=False) + "\n"
+    # A thread de controle também emite eventos
+    with _emit_lock:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+
+def exit_code(summary: dict) -> int:
+    """Traduz o resumo da execução em um código de saída."""
+    status = summary['status']
+    if status.get('error'):
+        return EXIT_ERRORS
+    if status.get('skipped'):
+        return EXIT_SKIPPED
+    return EXIT_OK
+
+
+def _dry_run(processor: FileProcessor, args: argparse.Namespace) -> int:
+    """Calcula o plano da execução sem transferir nada e emite os totais."""
+    try:
+        plan = build_plan(processor, args.sources, args.model, args.destination)
+        if not args.summary_only:
+            for entry, action, dest_path in plan.files:
+                emit("planned", path=entry.path, action=action, dest_path=dest_path, size=entry.stat.st_size)
+        if args.plan_out:
+            plan.save(args.plan_out)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        emit("error", message=f"Erro na simulação: {str(e)}")
+        return EXIT_FATAL
+    finally:
+        processor.close()
+    emit("plan_summary", plan_file=args.plan_out, **plan.totals)
+    return EXIT_OK
+
+
+def _read_controls(processor: FileProcessor, cancel_event: threading.Event, stream=None):
+    """Aplica os comandos JSON lidos da entrada padrão, um por linha.
+
+    Exemplos: {"max_rate": "5M"}, {"max_files_rate": 20, "busy_threshold": 0}, {"stop": true}
+    """
+    for line in stream or sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            command = json.loads(line)
+            if command.get('stop'):
+                cancel_event.set()
+                emit("stopping")
+                return
+            max_rate = command.get('max_rate')
+            if isinstance(max_rate, str):
+                max_rate = parse_rate(max_rate)
+            processor.limiter.set_limits(bytes_per_second=max_rate,
+                                         files_per_second=command.get('max_files_rate'),
+                                         busy_threshold=command.get('busy_threshold'))
+            emit("limits", busy_threshold=processor.limiter.busy_threshold, **processor.limiter.limits())
+        except (ValueError, TypeError, AttributeError, argparse.ArgumentTypeError) as e:
+            emit("error", message=f"Comando de controle inválido: {str(e)}")
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Executa o processamento conforme os argumentos e retorna o código de saída."""
+    args = build_parser().parse_args(argv)
+    if args.workers < 1:
+        emit("error", message="O número de trabalhadores deve ser pelo menos 1")
+        return EXIT_USAGE
+    if args.watch and args.resume is not None:
+        emit("error", message="O modo de vigília não pode retomar um trabalho")
+        return EXIT_USAGE
+    if args.dedupe and args.watch:
+        emit("error", message="A deduplicação global não pode ser usada no modo de vigília")
+        return EXIT_USAGE
+    if args.plan and (args.watch or args.resume is not None or args.dry_run):
+        emit("error", message="--plan não pode ser combinado com --watch, --resume ou --dry-run")
+        return EXIT_USAGE
+    plan = None
+    if args.plan:
+        try:
+            plan = RunPlan.load(args.plan)
+        except (OSError, ValueError, KeyError) as e:
+            emit("error", message=f"Não foi possível ler o plano: {str(e)}")
+            return EXIT_USAGE
+        args.sources, args.model, args.destination = plan.sources, plan.model, plan.destination
+    if args.resume is None:
+        if not args.sources or not args.destination:
+            emit("error", message="Informe as pastas de origem e o destino (-d)")
+            return EXIT_USAGE
+        for source in args.sources:
+            if not os.path.isdir(source):
+                emit("error", message=f"Pasta de origem não encontrada: {source}")
+                return EXIT_USAGE
+
+    try:
+        processor = FileProcessor(
+            use_hash_index=not args.no_hash_index,
+            hash_algorithm=args.hash,
+            mode=args.mode,
+            # O manifesto incremental evita reprocessar o que a reconciliação reencontra
+            incremental=args.incremental or args.watch,
+            profile=args.profile,
+            structured_log=args.log_json,
+            dedupe=args.dedupe,
+            max_bytes_per_second=args.max_rate,
+            max_files_per_second=args.max_files_rate,
+            busy_threshold=args.busy_threshold or None
+        )
+        if plan is not None:
+            # As opções da simulação prevalecem sobre as da linha de comando
+            processor.apply_job_params(plan.params)
+        if args.resume is not None:
+            journal = processor.resume_journal(args.resume or None)
+            if journal is None:
+                emit("error", message="Nenhum trabalho interrompido para retomar")
+                return EXIT_USAGE
+            args.sources = journal.params['sources']
+            args.model = journal.params['model']
+            args.destination = journal.params['destination']
+            emit("resume", journal=journal.path, completed=len(journal.completed))
+        elif args.no_journal or args.watch or args.dry_run:
+            journal = None
+        else:
+            journal = processor.create_journal(args.sources, args.model, args.destination)
+    except Exception as e:
+        emit("error", message=f"Erro ao iniciar processamento: {str(e)}")
+        return EXIT_FATAL
+
+    if args.dry_run:
+        return _dry_run(processor, args)
+
+    cancel_event = threading.Event()
+    if plan is not None:
+        scanner = plan
+        emit("plan", plan=args.plan, files=plan.discovered)
+    elif args.watch:
+        scanner = FolderWatcher(args.sources, exclude=[args.destination, LOG_DIR], debounce=args.debounce,
+                                reconcile_interval=args.reconcile_interval, logger=processor.logger,
+                                manifest=RunManifest.for_destination(LOG_DIR, args.destination)).start()
+        signal.signal(signal.SIGTERM, _interrupt)
+        emit("watch", sources=args.sources, inotify=scanner.inotify is not None)
+    else:
+        scanner = processor.scan_files(args.sources, args.destination)
+    if args.control_stdin:
+        threading.Thread(target=_read_controls, args=(processor, cancel_event), name="ControlStdin",
+                         daemon=True).start()
+    start = time.monotonic()
+    processed = 0
+    code = EXIT_OK
+    results = None
+    try:
+        results = processor.process_entries(
+            scanner,
+            args.model,
+            args.destination,
+            workers=args.workers,
+            use_processes=args.processes,
+            cancel_event=cancel_event,
+            journal=journal,
+            progress=None if args.summary_only else _dedupe_progress
+        )
+        for entry, result in results:
+            processed += 1
+            # Na vigília, um arquivo reencontrado sem mudanças não é notícia
+            if not args.summary_only and not (args.watch and result['status'] == 'unchanged'):
+                emit("file", path=entry.path, status=result['status'], message=result['message'],
+                     processed=processed, discovered=scanner.discovered)
+        if cancel_event.is_set():
+            code = EXIT_INTERRUPTED
+    except KeyboardInterrupt:
+        cancel_event.set()
+        code = EXIT_INTERRUPTED
+    except Exception as e:
+        emit("error", message=f"Erro no processamento: {str(e)}")
+        code = EXIT_FATAL
+    finally:
+        scanner.stop()
+        if results is not None:
+            results.close()
+        processor.close()
+
+    if plan is not None:
+        emit("plan_drift", **plan.drift)
+    if args.watch and code == EXIT_INTERRUPTED:
+        # No modo de vigília a interrupção é a forma normal de encerrar
+        code = EXIT_OK
+    summary = processor.run_summary
+    emit("summary", processed=processed, discovered=scanner.discovered,
+         elapsed=round(time.monotonic() - start, 3), interrupted=code == EXIT_INTERRUPTED,
+         summary_file=processor.last_summary_path, metrics=processor.metrics.snapshot(), **summary)
+    if code != EXIT_OK:
+        return code
+    return exit_code(summary)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
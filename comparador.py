@@ -0,0 +1,139 @@
+import os
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from indice_hash import HashIndex
+from io_arquivos import copy_and_hash, hash_file
+from metricas import RunMetrics
+
+try:
+    import xxhash
+except ImportError:  # xxhash é opcional
+    xxhash = None
+
+
+def _xxhash_factory():
+    return xxhash.xxh3_128()
+
+
+HASH_ALGORITHMS: Dict[str, Callable] = {
+    'sha256': hashlib.sha256,
+    'blake2b': hashlib.blake2b,
+}
+if xxhash is not None:
+    HASH_ALGORITHMS['xxhash'] = _xxhash_factory
+
+
+def new_hasher(algorithm: str):
+    """Cria um objeto de hash para o algoritmo informado."""
+    try:
+        return HASH_ALGORITHMS[algorithm]()
+    except KeyError:
+        raise ValueError(f"Algoritmo de hash não suportado: {algorithm}") from None
+
+
+class FileComparator:
+    """Compara arquivos em etapas: tamanho, hash parcial e hash completo.
+
+    Cada etapa só é executada quando a anterior não consegue decidir, e o
+    atributo `stats` conta quantas comparações foram decididas em cada uma.
+    """
+
+    STAGES = ('size', 'partial', 'full')
+
+    def __init__(self, algorithm: str = 'sha256', hash_index: Optional[HashIndex] = None,
+                 partial_block: int = 64 * 1024, logger: Optional[logging.Logger] = None,
+                 metrics: Optional[RunMetrics] = None):
+        new_hasher(algorithm)  # valida o algoritmo antes de começar
+        self.algorithm = algorithm
+        self.hash_index = hash_index
+        self.partial_block = partial_block
+        self.logger = logger or logging.getLogger("FileProcessor")
+        self.metrics = metrics or RunMetrics()
+        self.stats = {stage: 0 for stage in self.STAGES}
+        self._lock = threading.Lock()
+
+    def compare(self, path_a: str, path_b: str, st_a: Optional[os.stat_result] = None,
+                st_b: Optional[os.stat_result] = None) -> Tuple[bool, str]:
+        """Retorna se os arquivos têm o mesmo conteúdo e a etapa que decidiu."""
+        st_a = st_a or os.stat(path_a)
+        st_b = st_b or os.stat(path_b)
+
+        if st_a.st_size != st_b.st_size:
+            return self._decided(False, 'size')
+
+        # Arquivos pequenos são lidos inteiros no hash parcial
+        if st_a.st_size > 2 * self.partial_block:
+            if self.partial_hash(path_a, st_a) != self.partial_hash(path_b, st_b):
+                return self._decided(False, 'partial')
+
+        equal = self.full_hash(path_a, st_a) == self.full_hash(path_b, st_b)
+        return self._decided(equal, 'full')
+
+    def partial_hash(self, path: str, st: Optional[os.stat_result] = None) -> str:
+        """Gera o hash do primeiro e do último bloco do arquivo."""
+        st = st or os.stat(path)
+        cached = self._cached(path, st, 'partial')
+        if cached:
+            return cached
+
+        hasher = new_hasher(self.algorithm)
+        read = 0
+        with self.metrics.stage('hash'), open(path, "rb") as f:
+            block = f.read(self.partial_block)
+            hasher.update(block)
+            read += len(block)
+            if st.st_size > self.partial_block:
+                f.seek(max(st.st_size - self.partial_block, self.partial_block))
+                block = f.read(self.partial_block)
+                hasher.update(block)
+                read += len(block)
+        self.metrics.add('hash_bytes', read)
+        self.metrics.add('bytes_read', read)
+        digest = hasher.hexdigest()
+        self._store(path, st, digest, 'partial')
+        return digest
+
+    def full_hash(self, path: str, st: Optional[os.stat_result] = None) -> str:
+        """Gera o hash do conteúdo completo do arquivo."""
+        st = st or os.stat(path)
+        cached = self._cached(path, st, 'full')
+        if cached:
+            return cached
+
+        hasher = new_hasher(self.algorithm)
+        with self.metrics.stage('hash'):
+            read = hash_file(path, hasher)
+        self.metrics.add('hash_bytes', read)
+        self.metrics.add('bytes_read', read)
+        digest = hasher.hexdigest()
+        self._store(path, st, digest, 'full')
+        return digest
+
+    def copy_with_hash(self, src: str, dst: str, st: Optional[os.stat_result] = None) -> str:
+        """Copia o arquivo calculando o hash da origem na mesma leitura e registra o hash de ambos."""
+        st = st or os.stat(src)
+        hasher = new_hasher(self.algorithm)
+        copied = copy_and_hash(src, dst, hasher)
+        self.metrics.add('hash_bytes', copied)
+        self.metrics.add('bytes_read', copied)
+        self.metrics.add('bytes_written', copied)
+        digest = hasher.hexdigest()
+        self._store(src, st, digest, 'full')
+        return digest
+
+    def _cached(self, path: str, st: os.stat_result, kind: str) -> Optional[str]:
+        if self.hash_index:
+            return self.hash_index.get(path, st, self.algorithm, kind)
+        return None
+
+    def _store(self, path: str, st: os.stat_result, digest: str, kind: str):
+        if self.hash_index:
+            self.hash_index.put(path, st, digest, self.algorithm, kind)
+
+    def _decided(self, equal: bool, stage: str) -> Tuple[bool, str]:
+        with self._lock:
+            self.stats[stage] += 1
+        return equal, stage
@@ -0,0 +1,144 @@
+"""Deduplicação global: arquivos de conteúdo idêntico em todas as origens.
+
+Os arquivos são agrupados por tamanho, depois pelo hash parcial e por fim
+pelo hash completo, reaproveitando o índice de hashes do comparador. O
+primeiro arquivo de cada grupo, na ordem da varredura, é gravado no destino
+normalmente; os demais viram hardlinks ou reflinks desse arquivo.
+"""
+import time
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from comparador import FileComparator
+
+if TYPE_CHECKING:
+    from processador import ScannedFile
+
+# Formas de gravar as cópias repetidas
+DEDUPE_MODES = ('hardlink', 'reflink')
+
+# Intervalo mínimo entre os avisos de progresso da leitura, em segundos
+PROGRESS_INTERVAL = 0.5
+
+
+class DuplicateGroups:
+    """Grupos de arquivos idênticos, com o arquivo principal de cada grupo.
+
+    Durante o processamento, cada duplicado aguarda o principal ser gravado
+    e usa o destino publicado por ele. Se o principal falhar, o duplicado é
+    processado normalmente.
+    """
+
+    def __init__(self, primary_of: Dict[str, str], groups: int = 0, duplicate_bytes: int = 0):
+        self.primary_of = primary_of
+        self.groups = groups
+        self.duplicate_bytes = duplicate_bytes
+        self._done: Dict[str, threading.Event] = {path: threading.Event() for path in set(primary_of.values())}
+        self._dest: Dict[str, Optional[str]] = {}
+
+    @classmethod
+    def build(cls, entries: List["ScannedFile"], comparator: FileComparator, workers: int = 1,
+              logger: Optional[logging.Logger] = None, cancel_event: Optional[threading.Event] = None,
+              progress: Optional[Callable[[str, int, int], None]] = None) -> "DuplicateGroups":
+        """Agrupa os arquivos idênticos; só lê o conteúdo dos que têm tamanho repetido.
+
+        A leitura para assim que `cancel_event` é sinalizado, retornando grupos
+        vazios. `progress` recebe a etapa ('partial' ou 'full'), os arquivos já
+        lidos e o total da etapa.
+        """
+        logger = logger or logging.getLogger("FileProcessor")
+        cancel_event = cancel_event or threading.Event()
+        by_size: Dict[int, List["ScannedFile"]] = defaultdict(list)
+        for entry in entries:
+            # Arquivos vazios não ocupam espaço; vinculá-los não economiza nada
+            if entry.stat.st_size > 0:
+                by_size[entry.stat.st_size].append(entry)
+        groups = [group for group in by_size.values() if len(group) > 1]
+
+        executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="Deduplicator")
+        try:
+            # Arquivos pequenos são lidos inteiros no hash parcial; vão direto ao completo
+            large = [group for group in groups if group[0].stat.st_size > 2 * comparator.partial_block]
+            small = [group for group in groups if group[0].stat.st_size <= 2 * comparator.partial_block]
+            groups = small + _split(large, comparator.partial_hash, executor, logger, cancel_event,
+                                    progress, 'partial')
+            groups = _split(groups, comparator.full_hash, executor, logger, cancel_event, progress, 'full')
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if cancel_event.is_set():
+            logger.info("Deduplicação interrompida antes do fim da leitura")
+            return cls({})
+
+        primary_of: Dict[str, str] = {}
+        duplicate_bytes = 0
+        for group in groups:
+            primary = group[0].path
+            for entry in group[1:]:
+                primary_of[entry.path] = primary
+                duplicate_bytes += entry.stat.st_size
+        result = cls(primary_of, len(groups), duplicate_bytes)
+        logger.info(f"Deduplicação: {len(groups)} grupos, {len(primary_of)} duplicados, "
+                    f"{duplicate_bytes} bytes repetidos")
+        return result
+
+    def primary(self, path: str) -> Optional[str]:
+        """Retorna o arquivo principal do grupo, ou None se `path` não for um duplicado."""
+        return self.primary_of.get(path)
+
+    def publish(self, path: str, dest_path: Optional[str]):
+        """Registra o destino de um arquivo principal (None se falhou) e libera seus duplicados."""
+        event = self._done.get(path)
+        if event is not None and not event.is_set():
+            self._dest[path] = dest_path
+            event.set()
+
+    def wait(self, primary: str) -> Optional[str]:
+        """Aguarda o arquivo principal ser processado e retorna o destino dele."""
+        self._done[primary].wait()
+        return self._dest.get(primary)
+
+    def release(self):
+        """Libera todos os duplicados ainda aguardando, por exemplo em um cancelamento."""
+        for event in self._done.values():
+            event.set()
+
+
+def _split(groups: List[List["ScannedFile"]], digest: Callable, executor: ThreadPoolExecutor,
+           logger: logging.Logger, cancel_event: threading.Event,
+           progress: Optional[Callable[[str, int, int], None]], stage: str) -> List[List["ScannedFile"]]:
+    """Divide cada grupo pelo hash calculado, mantendo a ordem da varredura."""
+    flat = [entry for group in groups for entry in group]
+
+    def key(entry: "ScannedFile") -> Optional[str]:
+        if cancel_event.is_set():
+            return None
+        try:
+            return digest(entry.path, entry.stat)
+        except OSError as e:
+            logger.warning(f"Arquivo fora da deduplicação, erro ao ler {entry.path}: {str(e)}")
+            return None
+
+    values = []
+    last_report = time.monotonic()
+    for value in executor.map(key, flat):
+        if cancel_event.is_set():
+            return []
+        values.append(value)
+        now = time.monotonic()
+        if progress and (now - last_report >= PROGRESS_INTERVAL or len(values) == len(flat)):
+            progress(stage, len(values), len(flat))
+            last_report = now
+
+    keys = iter(values)
+    result = []
+    for group in groups:
+        by_hash: Dict[str, List["ScannedFile"]] = defaultdict(list)
+        for entry in group:
+            value = next(keys)
+            if value is not None:
+                by_hash[value].append(entry)
+        result.extend(subgroup for subgroup in by_hash.values() if len(subgroup) > 1)
+    return result
@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+
+class JobJournal:
+    """Diário de um trabalho de organização, gravado antes das operações (write-ahead).
+
+    Cada linha é um registro JSON: o cabeçalho com os parâmetros do trabalho,
+    o início ('s') e a conclusão ('d') de cada arquivo e o encerramento ('end').
+    Os registros são sincronizados com o disco em pequenos lotes. Ao retomar,
+    os arquivos concluídos são ignorados e os que ficaram em andamento são
+    refeitos do zero.
+    """
+
+    def __init__(self, path: str, params: Dict[str, Any], completed: Optional[Set[str]] = None,
+                 fsync_every: int = 256, fsync_interval: float = 1.0):
+        self.path = path
+        self.params = params
+        self.completed: Set[str] = completed or set()
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def create(cls, log_dir: str, params: Dict[str, Any]) -> "JobJournal":
+        """Cria o diário de um novo trabalho."""
+        jobs_dir = os.path.join(log_dir, "trabalhos")
+        os.makedirs(jobs_dir, exist_ok=True)
+        job_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        journal = cls(os.path.join(jobs_dir, f"trabalho_{job_id}.jsonl"), params)
+        journal._append({'o': 'job', 'params': params}, sync=True)
+        return journal
+
+    @classmethod
+    def resume(cls, path: str) -> "JobJournal":
+        """Reabre o diário de um trabalho interrompido para continuá-lo."""
+        params: Dict[str, Any] = {}
+        completed: Set[str] = set()
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Última linha truncada por uma queda
+                    continue
+                if record['o'] == 'job':
+                    params = record['params']
+                elif record['o'] == 'd':
+                    completed.add(record['s'])
+        journal = cls(path, params, completed)
+        journal._append({'o': 'resume'}, sync=True)
+        return journal
+
+    @staticmethod
+    def find_unfinished(log_dir: str) -> Optional[str]:
+        """Retorna o diário mais recente que não foi encerrado, se houver."""
+        jobs_dir = os.path.join(log_dir, "trabalhos")
+        try:
+            names = sorted((n for n in os.listdir(jobs_dir) if n.endswith(".jsonl")), reverse=True)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            path = os.path.join(jobs_dir, name)
+            if not _last_record_is_end(path):
+                return path
+        return None
+
+    def is_completed(self, source_path: str) -> bool:
+        """Indica se o arquivo já foi concluído neste trabalho."""
+        return source_path in self.completed
+
+    def started(self, source_path: str):
+        """Registra que o processamento do arquivo começou."""
+        self._append({'o': 's', 's': source_path})
+
+    def done(self, source_path: str, status: str, dest_path: Optional[str]):
+        """Registra a conclusão do processamento do arquivo."""
+        self.completed.add(source_path)
+        self._append({'o': 'd', 's': source_path, 'st': status, 'd': dest_path})
+
+    def finish(self):
+        """Encerra o trabalho e remove o diário, que só serve para retomadas.
+
+        O resumo da execução fica na pasta de logs; manter o diário, com duas
+        linhas por arquivo, faria a pasta de trabalhos crescer a cada execução.
+        """
+        self._append({'o': 'end'}, sync=True)
+        self.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass  # Fica encerrado no disco e não é mais oferecido para retomada
+
+    def close(self):
+        """Sincroniza os registros pendentes e fecha o diário."""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def _append(self, record: Dict[str, Any], sync: bool = False):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._pending += 1
+            if (sync or self._pending >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+
+def _last_record_is_end(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 256, 0))
+            lines = f.read().splitlines()
+        return bool(lines) and json.loads(lines[-1]).get('o') == 'end'
+    except (OSError, ValueError):
+        return False
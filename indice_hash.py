@@ -0,0 +1,113 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+
+class HashIndex:
+    """Índice persistente de hashes de conteúdo, armazenado em SQLite.
+
+    Cada entrada é identificada pelo caminho do arquivo e validada pelo
+    tamanho, mtime e inode. Quando qualquer um deles muda, a entrada é
+    descartada e o hash precisa ser recalculado.
+
+    As escritas ficam em memória e são gravadas em lotes, cada um em uma
+    transação curta aberta com BEGIN IMMEDIATE. Assim vários processos podem
+    compartilhar o mesmo arquivo: nenhum mantém uma transação aberta entre
+    os lotes, e quem chega a um banco ocupado aguarda o `timeout` em vez de
+    falhar com "database is locked".
+    """
+
+    def __init__(self, db_path: str, commit_every: int = 500, commit_interval: float = 2.0,
+                 timeout: float = 30.0):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        # (caminho, algoritmo, tipo) -> (tamanho, mtime_ns, inode, hash), ou None para remover
+        self._pending: Dict[Tuple[str, str, str], Optional[Tuple[int, int, int, str]]] = {}
+        self._last_commit = time.monotonic()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # Sem transações implícitas: as leituras não seguram o banco e as escritas usam BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS hashes (
+                path TEXT NOT NULL,
+                algorithm TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (path, algorithm, kind)
+            )"""
+        )
+
+    def get(self, path: str, st: os.stat_result, algorithm: str = "sha256", kind: str = "full") -> Optional[str]:
+        """Retorna o hash guardado se o arquivo não mudou desde o registro."""
+        key = (path, algorithm, kind)
+        with self._lock:
+            if key in self._pending:
+                row = self._pending[key]
+            else:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, inode, digest FROM hashes WHERE path = ? AND algorithm = ? AND kind = ?",
+                    key
+                ).fetchone()
+            if row is None:
+                return None
+            if tuple(row[:3]) == (st.st_size, st.st_mtime_ns, st.st_ino):
+                return row[3]
+            self._pending[key] = None
+            self._after_write()
+            return None
+
+    def put(self, path: str, st: os.stat_result, digest: str, algorithm: str = "sha256", kind: str = "full"):
+        """Registra o hash de um arquivo junto com os metadados que o validam."""
+        with self._lock:
+            self._pending[(path, algorithm, kind)] = (st.st_size, st.st_mtime_ns, st.st_ino, digest)
+            self._after_write()
+
+    def flush(self):
+        """Grava no disco as alterações pendentes."""
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        """Grava as alterações pendentes e fecha o banco."""
+        with self._lock:
+            try:
+                self._commit()
+            finally:
+                self._conn.close()
+
+    def _after_write(self):
+        # Agrupa as escritas em lotes para não pagar uma transação por arquivo
+        if (len(self._pending) >= self.commit_every
+                or time.monotonic() - self._last_commit >= self.commit_interval):
+            try:
+                self._commit()
+            except sqlite3.OperationalError:
+                # Banco ocupado além do timeout: o índice é só um cache, tenta de novo no próximo lote
+                self._last_commit = time.monotonic()
+
+    def _commit(self):
+        if self._pending:
+            removed = [key for key, row in self._pending.items() if row is None]
+            rows = [key + row for key, row in self._pending.items() if row is not None]
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "DELETE FROM hashes WHERE path = ? AND algorithm = ? AND kind = ?", removed
+                )
+                self._conn.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._pending.clear()
+        self._last_commit = time.monotonic()
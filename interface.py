@@ -1,87 +1,295 @@
 import os
-import psutil
+import threading
 import traceback
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QFileDialog, QProgressBar, QLabel, QListWidget, QListWidgetItem,
-    QMessageBox, QFrame, QAction, QMenuBar
+    QFileDialog, QProgressBar, QLabel, QListWidget, QListView,
+    QMessageBox, QFrame, QAction, QMenuBar, QSpinBox, QComboBox, QCheckBox
+)
+from PyQt5.QtCore import (
+    QThread, pyqtSignal, Qt, QTimer, QAbstractListModel, QModelIndex, QSortFilterProxyModel
 )
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QTimer
 from PyQt5.QtGui import QIcon, QFont
-from processador import FileProcessor
+
+# O processador, o observador, o planejador e o psutil são importados só no
+# primeiro uso, para que a janela abra sem carregá-los
+
+# Rótulos exibidos para cada status retornado pelo processador
+STATUS_LABELS = {
+    'success': "Sucesso",
+    'skipped': "Duplicado",
+    'unchanged': "Inalterado",
+    'resumed': "Retomado",
+    'error': "Erro"
+}
+
+# Status exibidos na lista de resultados, na ordem dos códigos guardados no modelo
+RESULT_STATUSES = ["Sucesso", "Duplicado", "Inalterado", "Erro", "Cancelado", "Retomado"]
+
+# Intervalo entre as atualizações da lista e do progresso na interface, em segundos
+UPDATE_INTERVAL = 0.1
+
+# Ocupação do disco, em percentual, a partir da qual o processamento reduz a vazão, quando ativado
+DISK_BUSY_THRESHOLD = 90.0
+
+# Intervalo de atualização do monitor do sistema, em milissegundos
+MONITOR_INTERVAL = 1000
+
+
+class ResultsModel(QAbstractListModel):
+    """Modelo da lista de resultados, guardado em colunas e limitado a `capacity` linhas.
+
+    Quando a capacidade é excedida, as linhas mais antigas são descartadas em
+    blocos, de modo que a memória e o custo da interface não crescem com o
+    tamanho da execução.
+    """
+
+    StatusRole = Qt.UserRole + 1
+
+    def __init__(self, capacity=100_000, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self._names = []
+        self._statuses = bytearray()
+        self._details = []
+        self._icons = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        status = RESULT_STATUSES[self._statuses[row]]
+        if role == Qt.DisplayRole:
+            if status == "Sucesso":
+                return f"✓ {self._names[row]}"
+            return f"✗ {self._names[row]} - {status}"
+        if role == Qt.ToolTipRole:
+            return self._details[row]
+        if role == Qt.DecorationRole:
+            return self._icon("dialog-ok" if status == "Sucesso" else "dialog-error")
+        if role == self.StatusRole:
+            return status
+        return None
+
+    def append_results(self, results):
+        """Acrescenta um lote de resultados (nome, status, detalhes)."""
+        if not results:
+            return
+        overflow = len(self._names) + len(results) - self.capacity
+        if overflow > 0:
+            # Descarta um bloco maior que o necessário para não remover a cada lote
+            drop = min(len(self._names), overflow + self.capacity // 10)
+            self.beginRemoveRows(QModelIndex(), 0, drop - 1)
+            del self._names[:drop]
+            del self._statuses[:drop]
+            del self._details[:drop]
+            self.endRemoveRows()
+            results = results[-self.capacity:]
+
+        first = len(self._names)
+        self.beginInsertRows(QModelIndex(), first, first + len(results) - 1)
+        for name, status, details in results:
+            self._names.append(name)
+            self._statuses.append(RESULT_STATUSES.index(status) if status in RESULT_STATUSES else 3)
+            self._details.append(details)
+        self.endInsertRows()
+
+    def clear(self):
+        """Remove todos os resultados."""
+        self.beginResetModel()
+        self._names = []
+        self._statuses = bytearray()
+        self._details = []
+        self.endResetModel()
+
+    def _icon(self, name):
+        icon = self._icons.get(name)
+        if icon is None:
+            icon = self._icons[name] = QIcon.fromTheme(name)
+        return icon
+
+
+class StatusFilterProxy(QSortFilterProxyModel):
+    """Filtra a lista de resultados por status."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.status = None
+
+    def set_status(self, status):
+        self.status = status
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.status is None:
+            return True
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        return self.sourceModel().data(index, ResultsModel.StatusRole) == self.status
+
 
 class ProcessingThread(QThread):
-    update_progress = pyqtSignal(int, str)  # (progress_percent, current_file)
-    update_file = pyqtSignal(str, str, str) # (file_name, status, details)
+    """Processa os arquivos fora da thread da interface.
+
+    Os resultados e o progresso ficam em um buffer protegido por trava, que a
+    janela esvazia a cada UPDATE_INTERVAL com `take_updates`; assim a lista
+    acompanha o tempo mesmo quando o processamento fica parado à espera de
+    um arquivo lento ou de novos arquivos na vigília.
+    """
+
     error_occurred = pyqtSignal(str)
     finished = pyqtSignal()
+    cancelled = pyqtSignal()
 
-    def __init__(self, processor, sources, model, destination):
+    def __init__(self, processor, sources, model, destination, workers=1, use_processes=False, journal=None,
+                 watch=False, plan=None):
         super().__init__()
         self.processor = processor
         self.sources = sources
         self.model = model
         self.destination = destination
+        self.workers = workers
+        self.use_processes = use_processes
+        self.journal = journal
+        self.watch = watch
+        self.plan = plan
         self._is_running = True
-        self._cancel_requested = False
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._pending_files = []  # [(file_name, status, details), ...]
+        self._progress = None     # (progress_percent, current_file) ainda não exibido
 
     def run(self):
+        scanner = results = None
         try:
-            total_files = self.processor.calculate_total_files(self.sources)
-            if total_files == 0:
-                self.error_occurred.emit("Nenhum arquivo encontrado para processar!")
-                return
+            if self.plan is not None:
+                # O plano da simulação já traz os arquivos; não varre as origens de novo
+                scanner = self.plan
+            elif self.watch:
+                # Vigília: segue observando as origens até o usuário parar
+                from manifesto import RunManifest
+                from observador import FolderWatcher
+                from processador import LOG_DIR
+                scanner = FolderWatcher(self.sources, exclude=[self.destination, LOG_DIR],
+                                        logger=self.processor.logger,
+                                        manifest=RunManifest.for_destination(LOG_DIR, self.destination)).start()
+            else:
+                scanner = self.processor.scan_files(self.sources, self.destination)
+            results = self.processor.process_entries(
+                scanner,
+                self.model,
+                self.destination,
+                workers=self.workers,
+                use_processes=self.use_processes,
+                cancel_event=self._cancel_event,
+                journal=self.journal,
+                progress=self._dedupe_progress
+            )
 
             current_count = 0
-            for source in self.sources:
-                for root, _, files in os.walk(source):
-                    for file in files:
-                        if self._cancel_requested:
-                            self.update_file.emit(file, "Cancelado", "Processamento interrompido")
-                            return
-
-                        file_path = os.path.join(root, file)
-                        try:
-                            result = self.processor.process_file(
-                                file_path, 
-                                root,
-                                source,
-                                self.model,
-                                self.destination
-                            )
-                            
-                            current_count += 1
-                            progress = int((current_count / total_files) * 100)
-                            self.update_progress.emit(progress, file)
-                            
-                            if result['status'] == 'success':
-                                self.update_file.emit(file, "Sucesso", result['message'])
-                            else:
-                                self.update_file.emit(file, "Erro", result['message'])
-
-                        except Exception as e:
-                            error_msg = f"Erro crítico: {str(e)}"
-                            self.error_occurred.emit(error_msg)
-                            self.update_file.emit(file, "Erro", error_msg)
+            file = ""
+            for entry, result in results:
+                file = entry.name
+                current_count += 1
+                # Na vigília, os arquivos reencontrados sem mudanças não viram linhas na lista
+                row = None
+                if not (self.watch and result['status'] == 'unchanged'):
+                    row = (file, STATUS_LABELS.get(result['status'], "Erro"), result['message'])
+                self._publish(row, current_count, scanner.discovered, file)
+
+            if self._cancel_event.is_set():
+                scanner.stop()
+                self._publish((file, "Cancelado", "Processamento interrompido"),
+                              current_count, scanner.discovered, file)
+                results.close()
+                self.cancelled.emit()
+                return
+
+            if current_count == 0:
+                self.error_occurred.emit("Nenhum arquivo encontrado para processar!")
+                return
 
             self.finished.emit()
 
-        except Exception as e:
+        except Exception:
             self.error_occurred.emit(f"Erro no processamento: {traceback.format_exc()}")
         finally:
+            # Também após um erro: libera o observador (inotify e threads) e a fila do scanner
+            if scanner is not None:
+                scanner.stop()
+            if results is not None:
+                results.close()
+            self.processor.flush()
             self._is_running = False
 
+    def _publish(self, row, current_count, discovered, current_file):
+        # O total é o descoberto até agora; a varredura segue em paralelo
+        total_files = max(discovered, current_count)
+        with self._lock:
+            if row is not None:
+                self._pending_files.append(row)
+            self._progress = (int((current_count / total_files) * 100), current_file)
+
+    def _dedupe_progress(self, stage, done, total):
+        # A deduplicação lê os arquivos antes do processamento; mostra o andamento dessa leitura
+        label = "hash parcial" if stage == 'partial' else "hash completo"
+        with self._lock:
+            self._progress = (int((done / total) * 100), f"procurando duplicados ({label}) {done}/{total}")
+
+    def take_updates(self):
+        """Retorna e esvazia o progresso e os resultados ainda não exibidos."""
+        with self._lock:
+            progress, files = self._progress, self._pending_files
+            self._progress = None
+            self._pending_files = []
+        return progress, files
+
     def cancel(self):
-        self._cancel_requested = True
+        self._cancel_event.set()
+
+
+class PlanningThread(QThread):
+    plan_ready = pyqtSignal(object)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, processor, sources, model, destination):
+        super().__init__()
+        self.processor = processor
+        self.sources = sources
+        self.model = model
+        self.destination = destination
+
+    def run(self):
+        try:
+            from planejador import build_plan
+            self.plan_ready.emit(build_plan(self.processor, self.sources, self.model, self.destination))
+        except Exception:
+            self.error_occurred.emit(f"Erro na simulação: {traceback.format_exc()}")
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.processor = FileProcessor()
+        self._processor = None
+        self._psutil = None
+        self.thread = None
+        self.planning_thread = None
         self.sources = []
         self.current_theme = 'light'
         self.init_ui()
-        self.setup_themes()
+
+    @property
+    def processor(self):
+        """Processador de arquivos, criado no primeiro uso."""
+        if self._processor is None:
+            from processador import FileProcessor
+            self._processor = FileProcessor(profile=os.environ.get("ORGANIZADOR_PROFILE") == "1",
+                                            busy_threshold=self.busy_threshold(),
+                                            max_bytes_per_second=self.spin_rate.value() * 1024 * 1024,
+                                            max_files_per_second=self.spin_files_rate.value())
+        return self._processor
 
     def init_ui(self):
         """Inicializa a interface do usuário."""
@@ -91,10 +299,7 @@ class MainWindow(QMainWindow):
         self.setup_main_layout()
         self.setup_theme()
         self.setup_system_monitor()
-
-    def setup_themes(self):
-        """Configura os temas da aplicação."""
-        self.set_theme('light')
+        self.setup_update_timer()
 
     def setup_menu(self):
         """Configura o menu da aplicação."""
@@ -138,6 +343,49 @@ class MainWindow(QMainWindow):
         
         self.btn_remove_source = QPushButton("➖ Remover Origem", self)
         self.btn_remove_source.clicked.connect(self.remove_source)
+
+        mode_layout = QHBoxLayout()
+        self.combo_mode = QComboBox()
+        for label, mode in (("Copiar", 'copy'), ("Mover", 'move'), ("Hardlink", 'hardlink')):
+            self.combo_mode.addItem(label, mode)
+        mode_layout.addWidget(QLabel("Operação:"))
+        mode_layout.addWidget(self.combo_mode)
+
+        dedupe_layout = QHBoxLayout()
+        self.combo_dedupe = QComboBox()
+        for label, dedupe in (("Desativada", None), ("Hardlink", 'hardlink'), ("Reflink", 'reflink')):
+            self.combo_dedupe.addItem(label, dedupe)
+        dedupe_layout.addWidget(QLabel("Deduplicação global:"))
+        dedupe_layout.addWidget(self.combo_dedupe)
+
+        workers_layout = QHBoxLayout()
+        self.spin_workers = QSpinBox()
+        self.spin_workers.setRange(1, 64)
+        self.spin_workers.setValue(min(4, os.cpu_count() or 1))
+        self.combo_executor = QComboBox()
+        self.combo_executor.addItems(["Threads", "Processos"])
+        workers_layout.addWidget(QLabel("Trabalhadores:"))
+        workers_layout.addWidget(self.spin_workers)
+        workers_layout.addWidget(self.combo_executor)
+
+        # Limites de vazão; 0 significa sem limite e as alterações valem na hora
+        limits_layout = QHBoxLayout()
+        self.spin_rate = QSpinBox()
+        self.spin_rate.setRange(0, 100_000)
+        self.spin_rate.setSuffix(" MB/s")
+        self.spin_rate.setSpecialValueText("Sem limite")
+        self.spin_rate.valueChanged.connect(self.update_limits)
+        self.spin_files_rate = QSpinBox()
+        self.spin_files_rate.setRange(0, 1_000_000)
+        self.spin_files_rate.setSuffix(" arq/s")
+        self.spin_files_rate.setSpecialValueText("Sem limite")
+        self.spin_files_rate.valueChanged.connect(self.update_limits)
+        limits_layout.addWidget(QLabel("Limite:"))
+        limits_layout.addWidget(self.spin_rate)
+        limits_layout.addWidget(self.spin_files_rate)
+        # O próprio processamento ocupa o disco; o recuo fica a critério do usuário
+        self.chk_backoff = QCheckBox(f"Reduzir a vazão com o disco acima de {DISK_BUSY_THRESHOLD:.0f}% de ocupação")
+        self.chk_backoff.stateChanged.connect(self.update_limits)
         
         left_layout.addWidget(self.btn_add_source)
         left_layout.addWidget(QLabel("Pastas Origem:"))
@@ -145,6 +393,15 @@ class MainWindow(QMainWindow):
         left_layout.addWidget(self.btn_model)
         left_layout.addWidget(self.btn_dest)
         left_layout.addWidget(self.btn_remove_source)
+        left_layout.addLayout(mode_layout)
+        left_layout.addLayout(dedupe_layout)
+        left_layout.addLayout(workers_layout)
+        left_layout.addLayout(limits_layout)
+        left_layout.addWidget(self.chk_backoff)
+        self.chk_incremental = QCheckBox("Incremental (ignorar inalterados)")
+        left_layout.addWidget(self.chk_incremental)
+        self.chk_watch = QCheckBox("Vigília (processar arquivos que chegarem)")
+        left_layout.addWidget(self.chk_watch)
 
         # Painel Direito (Progresso e Resultados)
         right_panel = QFrame()
@@ -153,11 +410,32 @@ class MainWindow(QMainWindow):
         self.progress_bar = QProgressBar()
         self.lbl_status = QLabel("Status: Pronto")
         
-        self.file_list = QListWidget()
+        self.results_model = ResultsModel(parent=self)
+        self.results_proxy = StatusFilterProxy(self)
+        self.results_proxy.setSourceModel(self.results_model)
+        self.file_list = QListView()
+        self.file_list.setModel(self.results_proxy)
+        self.file_list.setUniformItemSizes(True)
         self.file_list.setMinimumWidth(500)
+
+        results_header = QHBoxLayout()
+        self.combo_filter = QComboBox()
+        self.combo_filter.addItem("Todos", None)
+        for status in RESULT_STATUSES:
+            self.combo_filter.addItem(status, status)
+        self.combo_filter.currentIndexChanged.connect(
+            lambda: self.results_proxy.set_status(self.combo_filter.currentData())
+        )
+        results_header.addWidget(QLabel("Arquivos Processados:"))
+        results_header.addStretch()
+        results_header.addWidget(QLabel("Filtro:"))
+        results_header.addWidget(self.combo_filter)
         
         self.system_info = QLabel()
         self.system_info.setAlignment(Qt.AlignRight)
+
+        self.lbl_metrics = QLabel()
+        self.lbl_metrics.setAlignment(Qt.AlignRight)
         
         control_layout = QHBoxLayout()
         self.btn_start = QPushButton("▶ Iniciar", self)
@@ -165,14 +443,21 @@ class MainWindow(QMainWindow):
         self.btn_stop.setEnabled(False)
         self.btn_start.clicked.connect(self.start_processing)
         self.btn_stop.clicked.connect(self.stop_processing)
+        self.btn_resume = QPushButton("⏯ Retomar", self)
+        self.btn_resume.clicked.connect(self.resume_processing)
+        self.btn_plan = QPushButton("🔎 Simular", self)
+        self.btn_plan.clicked.connect(self.plan_processing)
         
         control_layout.addWidget(self.btn_start)
         control_layout.addWidget(self.btn_stop)
+        control_layout.addWidget(self.btn_resume)
+        control_layout.addWidget(self.btn_plan)
         
         right_layout.addWidget(self.progress_bar)
         right_layout.addWidget(self.lbl_status)
-        right_layout.addWidget(QLabel("Arquivos Processados:"))
+        right_layout.addLayout(results_header)
         right_layout.addWidget(self.file_list)
+        right_layout.addWidget(self.lbl_metrics)
         right_layout.addWidget(self.system_info)
         right_layout.addLayout(control_layout)
 
@@ -185,10 +470,22 @@ class MainWindow(QMainWindow):
         self.set_theme('light')
 
     def setup_system_monitor(self):
-        """Configura o monitoramento do sistema."""
+        """Configura o monitoramento do sistema, que só roda durante o processamento."""
         self.timer = QTimer(self)
+        self.timer.setInterval(MONITOR_INTERVAL)
         self.timer.timeout.connect(self.update_system_stats)
-        self.timer.start(1000)
+
+    def setup_update_timer(self):
+        """Configura o temporizador que leva os resultados da thread de processamento para a tela."""
+        self.update_timer = QTimer(self)
+        self.update_timer.setInterval(int(UPDATE_INTERVAL * 1000))
+        self.update_timer.timeout.connect(self.flush_updates)
+
+    def start_system_monitor(self):
+        """Inicia o monitoramento do sistema; ele para sozinho quando não há trabalho em andamento."""
+        if not self.timer.isActive():
+            self.timer.start()
+            self.update_system_stats()
 
     def set_theme(self, theme):
         """Define o tema da aplicação."""
@@ -221,7 +518,7 @@ class MainWindow(QMainWindow):
         QPushButton:hover {
             background-color: #0063CC;
         }
-        QListWidget {
+        QListView {
             background-color: #FFFFFF;
             border: 1px solid #DDDDDD;
             border-radius: 4px;
@@ -260,7 +557,7 @@ class MainWindow(QMainWindow):
         QPushButton:hover {
             background-color: #0063CC;
         }
-        QListWidget {
+        QListView {
             background-color: #3A3A3A;
             border: 1px solid #454545;
             border-radius: 4px;
@@ -323,32 +620,121 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            self.thread = ProcessingThread(
-                self.processor,
-                self.sources,
-                self.model,
-                self.destination
-            )
+            self.processor.mode = self.combo_mode.currentData()
+            if self.chk_watch.isChecked():
+                # A vigília não tem fim definido; o manifesto incremental faz o papel do diário
+                # e a deduplicação global, que precisa de todos os arquivos antes, fica desativada
+                self.processor.incremental = True
+                self.processor.dedupe = None
+                self.start_thread(None, watch=True)
+                return
+            self.processor.incremental = self.chk_incremental.isChecked()
+            self.processor.dedupe = self.combo_dedupe.currentData()
+            journal = self.processor.create_journal(self.sources, self.model, self.destination)
+            self.start_thread(journal)
+
+        except Exception as e:
+            self.show_error(f"Erro ao iniciar processamento: {str(e)}")
 
-            # Conexões de sinais
-            self.thread.update_progress.connect(self.update_progress)
-            self.thread.update_file.connect(self.update_file_status)
-            self.thread.error_occurred.connect(self.show_error)
-            self.thread.finished.connect(self.on_processing_finished)
+    def plan_processing(self):
+        """Simula o processamento e mostra o plano antes de executar."""
+        if not self.validate_inputs():
+            return
 
-            self.btn_start.setEnabled(False)
-            self.btn_stop.setEnabled(True)
-            self.lbl_status.setText("Status: Processando...")
-            self.file_list.clear()
-            
-            self.thread.start()
+        self.processor.mode = self.combo_mode.currentData()
+        self.processor.incremental = self.chk_incremental.isChecked()
+        self.processor.dedupe = self.combo_dedupe.currentData()
+        self.planning_thread = PlanningThread(self.processor, self.sources, self.model, self.destination)
+        self.planning_thread.plan_ready.connect(self.on_plan_ready)
+        self.planning_thread.error_occurred.connect(self.on_plan_error)
+        self.btn_start.setEnabled(False)
+        self.btn_plan.setEnabled(False)
+        self.lbl_status.setText("Status: Simulando...")
+        self.planning_thread.start()
+        self.start_system_monitor()
+
+    def on_plan_error(self, message):
+        """Libera os controles e mostra o erro da simulação."""
+        self.btn_start.setEnabled(True)
+        self.btn_plan.setEnabled(True)
+        self.show_error(message)
 
+    def on_plan_ready(self, plan):
+        """Mostra o resumo do plano e, se o usuário confirmar, executa-o sem nova varredura."""
+        self.btn_start.setEnabled(True)
+        self.btn_plan.setEnabled(True)
+        self.lbl_status.setText("Status: Simulação concluída")
+        answer = QMessageBox.question(
+            self, "Simulação", f"{plan.summary_text()}\n\nExecutar este plano agora?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+        if answer != QMessageBox.Yes:
+            return
+        try:
+            self.processor.apply_job_params(plan.params)
+            journal = self.processor.create_journal(plan.sources, plan.model, plan.destination)
+            self.start_thread(journal, plan=plan)
         except Exception as e:
             self.show_error(f"Erro ao iniciar processamento: {str(e)}")
 
+    def resume_processing(self):
+        """Retoma o trabalho interrompido mais recente."""
+        try:
+            journal = self.processor.resume_journal()
+            if journal is None:
+                QMessageBox.information(self, "Retomar", "Nenhum trabalho interrompido para retomar.")
+                return
+
+            params = journal.params
+            self.sources = list(params['sources'])
+            self.model = params['model']
+            self.destination = params['destination']
+            self.source_list.clear()
+            for index, folder in enumerate(self.sources, 1):
+                self.source_list.addItem(f"📁 Pasta {index}: {os.path.basename(folder)}")
+            self.btn_model.setText(f"✅ Modelo: {os.path.basename(self.model or '')}")
+            self.btn_dest.setText(f"✅ Destino: {os.path.basename(self.destination)}")
+            self.combo_mode.setCurrentIndex(max(self.combo_mode.findData(self.processor.mode), 0))
+            self.chk_incremental.setChecked(self.processor.incremental)
+            self.combo_dedupe.setCurrentIndex(max(self.combo_dedupe.findData(self.processor.dedupe), 0))
+            self.start_thread(journal)
+
+        except Exception as e:
+            self.show_error(f"Erro ao retomar processamento: {str(e)}")
+
+    def start_thread(self, journal, watch=False, plan=None):
+        """Cria e inicia a thread de processamento."""
+        self.thread = ProcessingThread(
+            self.processor,
+            self.sources,
+            self.model,
+            self.destination,
+            workers=self.spin_workers.value(),
+            use_processes=self.combo_executor.currentText() == "Processos",
+            journal=journal,
+            watch=watch,
+            plan=plan
+        )
+
+        # Conexões de sinais
+        self.thread.error_occurred.connect(self.on_processing_error)
+        self.thread.finished.connect(self.on_processing_finished)
+        self.thread.cancelled.connect(self.on_processing_cancelled)
+
+        self.btn_start.setEnabled(False)
+        self.btn_plan.setEnabled(False)
+        self.btn_resume.setEnabled(False)
+        self.btn_stop.setEnabled(True)
+        self.lbl_status.setText("Status: Observando as origens..." if watch else "Status: Processando...")
+        self.results_model.clear()
+
+        self.thread.start()
+        self.update_timer.start()
+        self.start_system_monitor()
+
     def stop_processing(self):
         """Para o processamento dos arquivos."""
-        if hasattr(self, 'thread') and self.thread.isRunning():
+        if self.is_processing():
             self.thread.cancel()
             self.lbl_status.setText("Status: Cancelando...")
             self.btn_stop.setEnabled(False)
@@ -358,39 +744,113 @@ class MainWindow(QMainWindow):
         self.progress_bar.setValue(value)
         self.lbl_status.setText(f"Processando: {current_file}")
 
-    def update_file_status(self, file_name, status, details):
-        """Atualiza o status de um arquivo processado."""
-        item = QListWidgetItem()
-        if status == "Sucesso":
-            item.setIcon(QIcon.fromTheme("dialog-ok"))
-            item.setText(f"✓ {file_name}")
-            item.setToolTip(details)
-        else:
-            item.setIcon(QIcon.fromTheme("dialog-error"))
-            item.setText(f"✗ {file_name} - {status}")
-            item.setToolTip(details)
-        self.file_list.addItem(item)
+    def update_files_status(self, results):
+        """Acrescenta um lote de arquivos processados à lista de resultados."""
+        self.results_model.append_results(results)
         self.file_list.scrollToBottom()
 
+    def flush_updates(self):
+        """Exibe o progresso e os resultados acumulados pela thread de processamento."""
+        if self.thread is None:
+            return
+        with self.processor.metrics.stage('signal'):
+            progress, files = self.thread.take_updates()
+            if progress is not None:
+                self.update_progress(*progress)
+            if files:
+                self.update_files_status(files)
+
+    def stop_updates(self):
+        """Para o temporizador de atualização, exibindo antes o que ainda estava pendente."""
+        self.update_timer.stop()
+        self.flush_updates()
+
+    def on_processing_error(self, message):
+        """Exibe os últimos resultados e o erro que interrompeu o processamento."""
+        self.stop_updates()
+        self.show_error(message)
+
     def show_error(self, message):
         """Exibe uma mensagem de erro."""
         QMessageBox.critical(self, "Erro", message)
         self.btn_start.setEnabled(True)
+        self.btn_plan.setEnabled(True)
+        self.btn_resume.setEnabled(True)
         self.btn_stop.setEnabled(False)
         self.lbl_status.setText("Status: Erro ocorrido")
 
+    def on_processing_cancelled(self):
+        """Libera os controles quando o processamento é interrompido pelo usuário."""
+        self.stop_updates()
+        self.btn_start.setEnabled(True)
+        self.btn_plan.setEnabled(True)
+        self.btn_resume.setEnabled(True)
+        self.btn_stop.setEnabled(False)
+        if self.thread.watch:
+            self.lbl_status.setText("Status: Vigília encerrada")
+        else:
+            self.lbl_status.setText("Status: Processamento interrompido - use Retomar para continuar")
+
     def on_processing_finished(self):
         """Ações a serem tomadas quando o processamento for concluído."""
+        self.stop_updates()
         self.btn_start.setEnabled(True)
+        self.btn_plan.setEnabled(True)
+        self.btn_resume.setEnabled(True)
         self.btn_stop.setEnabled(False)
         self.lbl_status.setText("Status: Processamento concluído")
-        QMessageBox.information(self, "Concluído", "Processamento finalizado com sucesso!")
+        self.lbl_metrics.setText(self.processor.metrics.summary_text())
+        message = "Processamento finalizado com sucesso!"
+        if self.processor.incremental:
+            summary = self.processor.run_summary['incremental']
+            message += (f"\n\nNovos: {summary['new']} | Alterados: {summary['changed']}"
+                        f" | Inalterados: {summary['skipped']}")
+        if 'dedupe' in self.processor.run_summary:
+            dedupe = self.processor.run_summary['dedupe']
+            message += (f"\n\nDuplicados vinculados: {dedupe['linked']} de {dedupe['duplicates']}"
+                        f" | Economia: {dedupe['bytes_saved'] / (1024 * 1024):.1f} MB")
+        plan = self.thread.plan
+        if plan is not None and (plan.drift['changed'] or plan.drift['missing']):
+            message += (f"\n\nDesde a simulação: {plan.drift['changed']} arquivo(s) alterado(s),"
+                        f" {plan.drift['missing']} removido(s)")
+        if self.processor.last_summary_path:
+            message += f"\n\nResumo gravado em: {self.processor.last_summary_path}"
+        QMessageBox.information(self, "Concluído", message)
+
+    def update_limits(self):
+        """Aplica os limites de vazão escolhidos, inclusive durante o processamento."""
+        if self._processor is None:
+            return  # O processador ainda não existe; ele já nasce com os limites escolhidos
+        self.processor.limiter.set_limits(bytes_per_second=self.spin_rate.value() * 1024 * 1024,
+                                          files_per_second=self.spin_files_rate.value(),
+                                          busy_threshold=self.busy_threshold() or 0)
+
+    def busy_threshold(self):
+        """Limiar de ocupação do disco para o recuo, ou None se ele estiver desligado."""
+        return DISK_BUSY_THRESHOLD if self.chk_backoff.isChecked() else None
+
+    def is_processing(self):
+        """Indica se há um processamento em andamento."""
+        return self.thread is not None and self.thread.isRunning()
 
     def update_system_stats(self):
         """Atualiza as estatísticas do sistema."""
-        cpu = psutil.cpu_percent()
-        mem = psutil.virtual_memory().percent
-        disk = psutil.disk_usage('/').percent
+        planning = self.planning_thread is not None and self.planning_thread.isRunning()
+        if not self.is_processing() and not planning:
+            self.timer.stop()
+            return
+        if self._psutil is None:
+            import psutil
+            self._psutil = psutil
+        cpu = self._psutil.cpu_percent()
+        mem = self._psutil.virtual_memory().percent
+        disk = self._psutil.disk_usage('/').percent
         self.system_info.setText(
             f"CPU: {cpu:.1f}% | Memória: {mem:.1f}% | Disco: {disk:.1f}%"
-        )
\ No newline at end of file
+        )
+        if self.is_processing():
+            text = self.processor.metrics.summary_text()
+            limiter = self.processor.limiter
+            if limiter.backoff < 1.0:
+                text += f" | disco ocupado ({limiter.disk_busy:.0f}%): vazão em {limiter.backoff:.0%}"
+            self.lbl_metrics.setText(text)
\ No newline at end of file
@@ -0,0 +1,313 @@
+import os
+import sys
+import errno
+import shutil
+import uuid
+import ctypes
+import threading
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Pasta, dentro do destino, onde as cópias são escritas antes da renomeação atômica
+TEMP_DIR_NAME = ".organizador_parcial"
+
+# Tamanhos de bloco por tipo de armazenamento
+BLOCK_SIZES = {
+    'ssd': 1024 * 1024,
+    'hdd': 4 * 1024 * 1024,
+    'network': 8 * 1024 * 1024,
+}
+DEFAULT_BLOCK_SIZE = BLOCK_SIZES['ssd']
+
+# Sistemas de arquivos tratados como montagens de rede
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', 'sshfs', '9p',
+                       'ceph', 'glusterfs', 'fuse.glusterfs', 'afs', 'davfs', 'fuse.rclone'}
+
+_storage_cache: Dict[int, str] = {}
+_storage_lock = threading.Lock()
+_buffers = threading.local()
+
+# Erros que indicam que a cópia no kernel não é suportada para o par de arquivos
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                       errno.ENOTSUP, errno.ENOTSOCK, errno.EBADF, errno.EPERM}
+
+_CHUNK = 64 * 1024 * 1024
+
+# ioctl FICLONE de <linux/fs.h>: o destino passa a compartilhar os blocos da origem
+FICLONE = 0x40049409
+
+# Flag de renameat2 que faz a renomeação falhar se o destino já existir
+RENAME_NOREPLACE = 1
+_AT_FDCWD = -100
+
+# Erros do renameat2 que indicam falta de suporte à flag no sistema ou no sistema de arquivos
+_NOREPLACE_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP}
+
+# renameat2 da libc, carregado no primeiro uso; False quando indisponível
+_renameat2 = None
+
+
+def storage_type(path: str) -> str:
+    """Classifica o armazenamento do caminho como 'ssd', 'hdd' ou 'network'.
+
+    O resultado é guardado por dispositivo (st_dev). Quando o tipo não pode ser
+    determinado, o armazenamento é tratado como 'ssd'.
+    """
+    try:
+        dev = os.stat(path).st_dev
+    except OSError:
+        return 'ssd'
+    kind = _storage_cache.get(dev)
+    if kind is None:
+        kind = _detect_storage(path, dev)
+        with _storage_lock:
+            _storage_cache[dev] = kind
+    return kind
+
+
+def block_size_for(path: str) -> int:
+    """Retorna o tamanho de bloco de E/S adequado ao armazenamento do caminho."""
+    return BLOCK_SIZES.get(storage_type(path), DEFAULT_BLOCK_SIZE)
+
+
+def _detect_storage(path: str, dev: int) -> str:
+    if sys.platform.startswith("win"):
+        drive = os.path.splitdrive(os.path.abspath(path))[0]
+        return 'network' if drive.startswith("\\\\") else 'ssd'
+
+    major, minor = os.major(dev), os.minor(dev)
+    fs_type = _mount_fs_type(major, minor)
+    if fs_type in NETWORK_FILESYSTEMS:
+        return 'network'
+
+    # Partições não têm fila própria; a informação fica no disco pai
+    for queue_dir in ("queue", os.path.join("..", "queue")):
+        rotational = os.path.join(f"/sys/dev/block/{major}:{minor}", queue_dir, "rotational")
+        try:
+            with open(rotational) as f:
+                return 'hdd' if f.read().strip() == "1" else 'ssd'
+        except OSError:
+            continue
+    return 'ssd'
+
+
+def _mount_fs_type(major: int, minor: int) -> Optional[str]:
+    try:
+        with open("/proc/self/mountinfo") as f:
+            for line in f:
+                fields = line.split()
+                if fields[2] == f"{major}:{minor}":
+                    # O tipo vem logo após o separador "-"
+                    return fields[fields.index("-") + 1]
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _buffer(size: int) -> Tuple[bytearray, memoryview]:
+    """Retorna o buffer pré-alocado desta thread para o tamanho de bloco."""
+    cache = getattr(_buffers, 'cache', None)
+    if cache is None:
+        cache = _buffers.cache = {}
+    entry = cache.get(size)
+    if entry is None:
+        buf = bytearray(size)
+        entry = cache[size] = (buf, memoryview(buf))
+    return entry
+
+
+def hash_file(path: str, hasher, block_size: Optional[int] = None) -> int:
+    """Atualiza `hasher` com o conteúdo do arquivo e retorna a quantidade de bytes lidos."""
+    buf, view = _buffer(block_size or block_size_for(path))
+    total = 0
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(buf)
+            if not read:
+                break
+            hasher.update(view[:read])
+            total += read
+    return total
+
+
+def copy_and_hash(src: str, dst: str, hasher, block_size: Optional[int] = None) -> int:
+    """Copia `src` para `dst` calculando o hash durante a cópia, lendo a origem uma única vez.
+
+    `dst` é criado em modo exclusivo. Retorna a quantidade de bytes copiados.
+    """
+    buf, view = _buffer(block_size or max(block_size_for(src), block_size_for(os.path.dirname(dst) or ".")))
+    total = 0
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "xb", buffering=0) as fdst:
+        while True:
+            read = fsrc.readinto(buf)
+            if not read:
+                break
+            chunk = view[:read]
+            hasher.update(chunk)
+            written = 0
+            while written < read:
+                written += fdst.write(chunk[written:])
+            total += read
+    shutil.copystat(src, dst)
+    return total
+
+
+def temp_path_for(destination: str) -> str:
+    """Retorna um caminho temporário único dentro da pasta de cópias parciais do destino."""
+    temp_dir = os.path.join(destination, TEMP_DIR_NAME)
+    os.makedirs(temp_dir, exist_ok=True)
+    return os.path.join(temp_dir, f"{uuid.uuid4().hex}.part")
+
+
+def commit_temp(temp_path: str, dst: str):
+    """Move a cópia temporária para o nome final de forma atômica, sem sobrescrever.
+
+    Levanta FileExistsError se `dst` já existir, inclusive em sistemas de
+    arquivos sem hardlinks, como exFAT e muitas montagens SMB.
+    """
+    rename_no_replace(temp_path, dst)
+
+
+def rename_no_replace(src: str, dst: str):
+    """Renomeia `src` para `dst` sem nunca sobrescrever um arquivo existente.
+
+    Levanta FileExistsError se `dst` já existir. No Linux usa renameat2 com
+    RENAME_NOREPLACE; sem suporte, cria um hardlink e remove a origem. Se o
+    sistema de arquivos também não tiver hardlinks, reserva o nome com um
+    arquivo vazio criado em modo exclusivo e só então o substitui.
+    """
+    if _rename_noreplace(src, dst):
+        return
+    try:
+        os.link(src, dst, follow_symlinks=False)
+    except FileExistsError:
+        raise
+    except OSError:
+        if os.name == "nt":
+            # No Windows os.rename já falha se o destino existir
+            os.rename(src, dst)
+            return
+        os.close(os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+        try:
+            os.replace(src, dst)
+        except BaseException:
+            os.unlink(dst)
+            raise
+        return
+    os.unlink(src)
+
+
+def _rename_noreplace(src: str, dst: str) -> bool:
+    """Tenta renameat2(RENAME_NOREPLACE); retorna False se não houver suporte."""
+    global _renameat2
+    if _renameat2 is None:
+        _renameat2 = _load_renameat2()
+    if not _renameat2:
+        return False
+    if _renameat2(_AT_FDCWD, os.fsencode(src), _AT_FDCWD, os.fsencode(dst), RENAME_NOREPLACE) == 0:
+        return True
+    err = ctypes.get_errno()
+    if err == errno.EEXIST:
+        raise FileExistsError(err, os.strerror(err), dst)
+    if err in _NOREPLACE_UNSUPPORTED:
+        return False
+    raise OSError(err, os.strerror(err), src, None, dst)
+
+
+def _load_renameat2():
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        function = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False  # glibc anterior à 2.28 ou outra libc sem renameat2
+    function.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint)
+    function.restype = ctypes.c_int
+    return function
+
+
+def clean_temp_dir(destination: str) -> int:
+    """Remove as cópias parciais deixadas por um trabalho interrompido e retorna quantas eram."""
+    temp_dir = os.path.join(destination, TEMP_DIR_NAME)
+    removed = 0
+    try:
+        with os.scandir(temp_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".part"):
+                    os.unlink(entry.path)
+                    removed += 1
+    except FileNotFoundError:
+        pass
+    return removed
+
+
+def copy_file(src: str, dst: str):
+    """Copia o conteúdo e os metadados de `src` para `dst`, sem passar os dados pelo Python quando possível.
+
+    `dst` é criado em modo exclusivo: se já existir, FileExistsError é levantado.
+    """
+    with open(src, "rb") as fsrc, open(dst, "xb") as fdst:
+        if not _kernel_copy(fsrc.fileno(), fdst.fileno()):
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            _copy_buffered(fsrc, fdst, block_size_for(src))
+    shutil.copystat(src, dst)
+
+
+def clone_file(src: str, dst: str):
+    """Cria `dst` como reflink de `src` (FICLONE), sem copiar os dados.
+
+    `dst` é criado em modo exclusivo. Levanta OSError quando o sistema de
+    arquivos não suporta reflinks ou os arquivos estão em volumes diferentes;
+    nesse caso `dst` é removido.
+    """
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "Reflinks não suportados neste sistema")
+    with open(src, "rb") as fsrc, open(dst, "xb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.unlink(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+def _copy_buffered(fsrc, fdst, block_size: int):
+    buf, view = _buffer(block_size)
+    while True:
+        read = fsrc.readinto(buf)
+        if not read:
+            break
+        fdst.write(view[:read])
+
+
+def _kernel_copy(in_fd: int, out_fd: int) -> bool:
+    """Tenta copiar com copy_file_range e depois sendfile; retorna False se nenhum estiver disponível."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            _copy_loop(lambda count: os.copy_file_range(in_fd, out_fd, count))
+            return True
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS or os.lseek(out_fd, 0, os.SEEK_CUR):
+                raise
+
+    if hasattr(os, "sendfile"):
+        try:
+            _copy_loop(lambda count: os.sendfile(out_fd, in_fd, None, count))
+            return True
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS or os.lseek(out_fd, 0, os.SEEK_CUR):
+                raise
+
+    return False
+
+
+def _copy_loop(copy_chunk):
+    while copy_chunk(_CHUNK):
+        pass
@@ -0,0 +1,277 @@
+"""Limitação de vazão do processamento, com prioridade para arquivos pequenos."""
+import math
+import time
+import logging
+import threading
+import multiprocessing
+from typing import Dict, List, Optional, Tuple
+
+# Intervalo entre as leituras de ocupação do disco, em segundos
+SAMPLE_INTERVAL = 1.0
+
+# Vazões mínimas usadas como base quando o recuo começa sem limite configurado
+MIN_BYTES_PER_SECOND = 1024 * 1024
+MIN_FILES_PER_SECOND = 10.0
+
+# Menor fração da vazão base mantida durante o recuo
+MIN_BACKOFF = 0.05
+
+
+class _Waiter:
+    __slots__ = ('size', 'since')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.since = time.monotonic()
+
+    def priority(self, now: float) -> float:
+        # Menor é melhor: cada segundo de espera vale o mesmo que reduzir o tamanho pela metade,
+        # para que arquivos grandes não fiquem esperando para sempre
+        return math.log2(self.size + 1) - (now - self.since)
+
+
+class SharedLimits:
+    """Limites de vazão em memória compartilhada com os processos trabalhadores.
+
+    O processo principal grava os limites totais; cada um dos `parts`
+    processos aplica a sua fração quando percebe que a versão mudou.
+    """
+
+    def __init__(self, parts: int, limits: Dict[str, float], busy_threshold: Optional[float]):
+        self.parts = parts
+        # Versão, bytes/s, arquivos/s e limiar de ocupação (0 = sem monitoramento)
+        self._values = multiprocessing.Array('d', 4)
+        self.update(limits['bytes_per_second'], limits['files_per_second'], busy_threshold)
+
+    @property
+    def version(self) -> float:
+        return self._values.get_obj()[0]
+
+    def update(self, bytes_per_second: float, files_per_second: float, busy_threshold: Optional[float]):
+        with self._values.get_lock():
+            self._values[1:4] = [bytes_per_second, files_per_second, busy_threshold or 0]
+            self._values[0] += 1
+
+    def read(self) -> Tuple[float, float, float, float]:
+        """Retorna a versão, os limites totais e o limiar de ocupação."""
+        with self._values.get_lock():
+            return tuple(self._values[:])
+
+
+class RateLimiter:
+    """Token buckets de bytes/s e arquivos/s compartilhados pelos trabalhadores.
+
+    Os limites podem ser alterados a qualquer momento com set_limits(); 0
+    significa sem limite. Quando vários trabalhadores aguardam, o arquivo
+    menor passa primeiro, com envelhecimento para os grandes. Com
+    `busy_threshold`, a ocupação dos discos informada pelo psutil é lida a
+    cada segundo e, acima do limiar, a vazão é reduzida pela metade até o
+    disco aliviar, voltando aos poucos depois.
+
+    Com processos trabalhadores, cada processo tem o seu limitador: o
+    principal publica os limites com share() e os dos trabalhadores os
+    acompanham com follow().
+    """
+
+    def __init__(self, bytes_per_second: float = 0, files_per_second: float = 0,
+                 busy_threshold: Optional[float] = None, burst_seconds: float = 1.0,
+                 logger: Optional[logging.Logger] = None):
+        self.burst_seconds = burst_seconds
+        self.busy_threshold = busy_threshold
+        self.logger = logger or logging.getLogger("FileProcessor")
+        self.backoff = 1.0
+        self.disk_busy: Optional[float] = None
+        self._cond = threading.Condition()
+        self._waiters: List[_Waiter] = []
+        self._bytes_rate = float(bytes_per_second or 0)
+        self._files_rate = float(files_per_second or 0)
+        self._bytes_tokens = self._files_tokens = 0.0
+        self._last_refill = time.monotonic()
+        # Vazão de referência do recuo e contagem da janela de amostragem
+        self._base: Dict[str, float] = {}
+        self._window = {'bytes': 0, 'files': 0}
+        self._last_sample = time.monotonic()
+        self._busy_counters: Optional[Dict[str, float]] = None
+        self._psutil = None
+        self._monitor_available = busy_threshold is not None
+        self._shared: Optional[SharedLimits] = None
+        self._shared_version: Optional[float] = None
+        self._fill_buckets()
+
+    @property
+    def active(self) -> bool:
+        """Indica se há algum limite ou monitoramento de disco em vigor."""
+        if self._shared_version is not None:
+            self._follow_shared()
+        return bool(self._bytes_rate or self._files_rate or self._monitor_available)
+
+    def share(self, parts: int) -> SharedLimits:
+        """Publica os limites atuais, e as alterações seguintes, para `parts` processos trabalhadores."""
+        self._shared = SharedLimits(parts, self.limits(), self.busy_threshold)
+        return self._shared
+
+    def unshare(self):
+        """Deixa de publicar as alterações dos limites."""
+        self._shared = None
+
+    def follow(self, shared: SharedLimits):
+        """Passa a aplicar a fração deste processo dos limites publicados pelo processo principal."""
+        self._shared = shared
+        self._shared_version = -1.0
+        self._follow_shared()
+
+    def _follow_shared(self):
+        if self._shared.version == self._shared_version:
+            return
+        version, bytes_per_second, files_per_second, busy_threshold = self._shared.read()
+        self._shared_version = version
+        parts = self._shared.parts
+        self.set_limits(bytes_per_second / parts, files_per_second / parts, busy_threshold)
+
+    def limits(self) -> Dict[str, float]:
+        """Retorna os limites configurados, em bytes/s e arquivos/s."""
+        return {'bytes_per_second': self._bytes_rate, 'files_per_second': self._files_rate}
+
+    def set_limits(self, bytes_per_second: Optional[float] = None, files_per_second: Optional[float] = None,
+                   busy_threshold: Optional[float] = None):
+        """Altera os limites durante a execução; os argumentos omitidos ficam como estão."""
+        with self._cond:
+            self._refill(time.monotonic())
+            if bytes_per_second is not None:
+                self._bytes_rate = float(bytes_per_second)
+            if files_per_second is not None:
+                self._files_rate = float(files_per_second)
+            if busy_threshold is not None:
+                self.busy_threshold = busy_threshold or None
+                self._monitor_available = self.busy_threshold is not None
+                if not self._monitor_available:
+                    self.backoff = 1.0
+            self._fill_buckets(clamp=True)
+            self._cond.notify_all()
+        if self._shared is not None and self._shared_version is None:
+            self._shared.update(self._bytes_rate, self._files_rate, self.busy_threshold)
+        self.logger.info(f"Limites de vazão alterados: {self.limits()}, limiar de disco: {self.busy_threshold}")
+
+    def acquire(self, size: int):
+        """Bloqueia até haver vazão disponível para um arquivo de `size` bytes."""
+        if not self.active:
+            return
+        waiter = _Waiter(size)
+        with self._cond:
+            self._waiters.append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._sample(now)
+                    self._refill(now)
+                    if self._next_waiter(now) is waiter:
+                        delay = self._shortage(size)
+                        if delay <= 0:
+                            break
+                    else:
+                        delay = 0.05
+                    self._cond.wait(min(delay, SAMPLE_INTERVAL))
+                bytes_rate, files_rate = self._effective_rates()
+                if bytes_rate:
+                    self._bytes_tokens -= size
+                if files_rate:
+                    self._files_tokens -= 1
+                self._window['bytes'] += size
+                self._window['files'] += 1
+            finally:
+                self._waiters.remove(waiter)
+                self._cond.notify_all()
+
+    def _next_waiter(self, now: float) -> _Waiter:
+        return min(self._waiters, key=lambda w: w.priority(now))
+
+    def _effective_rates(self):
+        bytes_rate, files_rate = self._bytes_rate, self._files_rate
+        if self.backoff < 1.0:
+            bytes_rate = (bytes_rate or self._base['bytes']) * self.backoff
+            files_rate = (files_rate or self._base['files']) * self.backoff
+        return bytes_rate, files_rate
+
+    def _capacities(self):
+        bytes_rate, files_rate = self._effective_rates()
+        return bytes_rate * self.burst_seconds, max(files_rate * self.burst_seconds, 1.0)
+
+    def _fill_buckets(self, clamp: bool = False):
+        """Enche os baldes, ou com `clamp` apenas os ajusta à capacidade dos novos limites."""
+        bytes_capacity, files_capacity = self._capacities()
+        if clamp:
+            self._bytes_tokens = min(self._bytes_tokens, bytes_capacity)
+            self._files_tokens = min(self._files_tokens, files_capacity)
+        else:
+            self._bytes_tokens, self._files_tokens = bytes_capacity, files_capacity
+
+    def _refill(self, now: float):
+        bytes_rate, files_rate = self._effective_rates()
+        bytes_capacity, files_capacity = self._capacities()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if bytes_rate:
+            self._bytes_tokens = min(bytes_capacity, self._bytes_tokens + bytes_rate * elapsed)
+        if files_rate:
+            self._files_tokens = min(files_capacity, self._files_tokens + files_rate * elapsed)
+
+    def _shortage(self, size: int) -> float:
+        """Segundos até haver tokens para o arquivo; 0 ou menos se já houver."""
+        bytes_rate, files_rate = self._effective_rates()
+        delay = 0.0
+        if bytes_rate:
+            # Um arquivo maior que o balde passa com o balde cheio e deixa um saldo negativo
+            needed = min(size, bytes_rate * self.burst_seconds)
+            delay = max(delay, (needed - self._bytes_tokens) / bytes_rate)
+        if files_rate:
+            delay = max(delay, (1.0 - self._files_tokens) / files_rate)
+        return delay
+
+    def _sample(self, now: float):
+        """Lê a ocupação dos discos e ajusta o recuo."""
+        elapsed = now - self._last_sample
+        if not self._monitor_available or elapsed < SAMPLE_INTERVAL:
+            return
+        observed = {key: value / elapsed for key, value in self._window.items()}
+        self._window = {'bytes': 0, 'files': 0}
+        self._last_sample = now
+
+        busy = self._read_disk_busy(elapsed)
+        if busy is None:
+            return
+        self.disk_busy = busy
+        if busy >= self.busy_threshold:
+            if self.backoff == 1.0:
+                self._base = {'bytes': max(observed['bytes'], MIN_BYTES_PER_SECOND),
+                              'files': max(observed['files'], MIN_FILES_PER_SECOND)}
+            self._refill(now)
+            backoff = max(self.backoff * 0.5, MIN_BACKOFF)
+            if backoff != self.backoff:
+                self.backoff = backoff
+                self.logger.info(f"Disco ocupado ({busy:.0f}%), vazão reduzida para {backoff:.0%}")
+        elif self.backoff < 1.0:
+            self._refill(now)
+            self.backoff = min(self.backoff * 1.25, 1.0)
+            if self.backoff == 1.0:
+                self.logger.info("Disco aliviado, vazão restabelecida")
+
+    def _read_disk_busy(self, elapsed: float) -> Optional[float]:
+        """Maior ocupação percentual entre os discos desde a última leitura."""
+        try:
+            if self._psutil is None:
+                import psutil
+                self._psutil = psutil
+            counters = {name: io.busy_time for name, io in
+                        self._psutil.disk_io_counters(perdisk=True, nowrap=True).items()}
+        except (ImportError, AttributeError, OSError, RuntimeError) as e:
+            # Sem psutil ou sem busy_time nesta plataforma: segue só com os limites fixos
+            self.logger.warning(f"Monitoramento da ocupação do disco indisponível: {str(e)}")
+            self._monitor_available = False
+            return None
+        previous, self._busy_counters = self._busy_counters, counters
+        if previous is None:
+            return None
+        deltas = [counters[name] - previous[name] for name in counters if name in previous]
+        if not deltas:
+            return None
+        return min(max(deltas) / (elapsed * 1000) * 100, 100.0)
@@ -0,0 +1,187 @@
+"""Registro assíncrono das atividades do processador.
+
+As mensagens são colocadas em uma fila pelo QueueHandler, sem formatação nem
+E/S na thread que as gera. Uma thread de escrita esvazia a fila em lotes,
+grava cada lote com uma única escrita e faz a rotação do arquivo por tamanho.
+"""
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from datetime import datetime
+from typing import List, Optional
+
+LOGGER_NAME = "FileProcessor"
+
+# Quantidade máxima de registros gravados por escrita
+BATCH_SIZE = 1000
+
+_setup_lock = threading.Lock()
+_listener: Optional["BatchingListener"] = None
+_handler: Optional[logging.Handler] = None
+_config: Optional[tuple] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada registro como uma linha JSON compacta."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            't': round(record.created, 3),
+            'l': record.levelname,
+            'm': record.getMessage()
+        }
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que adia a formatação da mensagem para a thread de escrita."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class BatchingListener:
+    """Thread que grava os registros da fila em lotes, com rotação por tamanho."""
+
+    _STOP = object()
+
+    def __init__(self, log_queue: "queue.SimpleQueue", path: str, formatter: logging.Formatter,
+                 max_bytes: int = 50 * 1024 * 1024, backup_count: int = 5):
+        self.queue = log_queue
+        self.path = path
+        self.formatter = formatter
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file = open(path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Grava os registros pendentes e encerra a thread."""
+        self.queue.put(self._STOP)
+        self._thread.join()
+        self._file.close()
+
+    def _run(self):
+        while True:
+            batch: List[logging.LogRecord] = [self.queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            lines = []
+            for record in batch:
+                if record is self._STOP:
+                    stop = True
+                    continue
+                try:
+                    lines.append(self.formatter.format(record))
+                except Exception:
+                    lines.append(f"Falha ao formatar registro: {record.msg!r}")
+            if lines:
+                self._write("\n".join(lines) + "\n")
+            if stop:
+                return
+
+    def _write(self, text: str):
+        try:
+            if self.max_bytes and self._size + len(text) > self.max_bytes and self._size:
+                self._rotate()
+            self._file.write(text)
+            self._file.flush()
+            self._size += len(text)
+        except OSError:
+            pass
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+
+
+def setup_logging(log_dir: str, structured: bool = False, rotate: bool = True,
+                  max_bytes: int = 50 * 1024 * 1024, backup_count: int = 5) -> logging.Logger:
+    """Configura o logger do processador; chamadas repetidas com a mesma configuração não têm efeito.
+
+    Com `structured`, o arquivo é gravado em JSONL. Com `rotate` desativado
+    (usado pelos processos trabalhadores, que compartilham o arquivo), não há
+    rotação por tamanho.
+    """
+    global _listener, _handler, _config
+    extension = "jsonl" if structured else "log"
+    path = os.path.join(log_dir, f"processamento_{datetime.now().strftime('%Y%m%d')}.{extension}")
+    config = (path, structured, rotate, max_bytes, backup_count)
+
+    logger = logging.getLogger(LOGGER_NAME)
+    with _setup_lock:
+        if _config == config:
+            return logger
+        _shutdown()
+
+        os.makedirs(log_dir, exist_ok=True)
+        if structured:
+            formatter: logging.Formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+        log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        _listener = BatchingListener(log_queue, path, formatter, max_bytes if rotate else 0, backup_count)
+        _listener.start()
+        _handler = _DeferredQueueHandler(log_queue)
+        logger.addHandler(_handler)
+        logger.setLevel(logging.INFO)
+        _config = config
+    return logger
+
+
+def shutdown_logging():
+    """Grava os registros pendentes e encerra a thread de escrita."""
+    with _setup_lock:
+        _shutdown()
+
+
+def _shutdown():
+    global _listener, _handler, _config
+    if _handler is not None:
+        logging.getLogger(LOGGER_NAME).removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    _config = None
+
+
+def _reset_after_fork():
+    # A thread de escrita não existe no processo filho; descarta o estado herdado
+    global _setup_lock, _listener, _handler, _config
+    if _handler is not None:
+        logging.getLogger(LOGGER_NAME).removeHandler(_handler)
+    _setup_lock = threading.Lock()
+    _listener = None
+    _handler = None
+    _config = None
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
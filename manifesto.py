@@ -0,0 +1,86 @@
+import os
+import time
+import sqlite3
+import hashlib
+from typing import Optional
+
+
+class RunManifest:
+    """Manifesto das execuções anteriores para um destino, usado no modo incremental.
+
+    Guarda, para cada arquivo de origem já processado, o tamanho, o mtime e o
+    caminho de destino. Um arquivo cujo tamanho e mtime não mudaram pode ser
+    ignorado sem consultar o destino.
+    """
+
+    NEW = 'new'
+    CHANGED = 'changed'
+    UNCHANGED = 'unchanged'
+
+    def __init__(self, db_path: str, commit_every: int = 1000, commit_interval: float = 5.0):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                source_path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                dest_path TEXT NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    @classmethod
+    def for_destination(cls, log_dir: str, destination: str) -> "RunManifest":
+        """Abre o manifesto associado a uma pasta de destino."""
+        key = hashlib.sha1(os.path.abspath(destination).encode("utf-8")).hexdigest()[:16]
+        return cls(os.path.join(log_dir, f"manifesto_{key}.sqlite3"))
+
+    def check(self, path: str, st: os.stat_result) -> str:
+        """Classifica o arquivo como novo, alterado ou inalterado desde a última execução."""
+        row = self._conn.execute(
+            "SELECT size, mtime_ns FROM entries WHERE source_path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return self.NEW
+        if row == (st.st_size, st.st_mtime_ns):
+            return self.UNCHANGED
+        return self.CHANGED
+
+    def record(self, path: str, st: os.stat_result, dest_path: str):
+        """Registra um arquivo processado nesta execução."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            (path, st.st_size, st.st_mtime_ns, dest_path)
+        )
+        self._pending += 1
+        # No modo de vigília os registros chegam aos poucos; o intervalo limita o que se perde
+        if (self._pending >= self.commit_every
+                or time.monotonic() - self._last_commit >= self.commit_interval):
+            self.save()
+
+    def get_destination(self, path: str) -> Optional[str]:
+        """Retorna o destino registrado para um arquivo de origem."""
+        row = self._conn.execute(
+            "SELECT dest_path FROM entries WHERE source_path = ?", (path,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self):
+        """Grava o manifesto no disco."""
+        self._conn.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        """Grava o manifesto e fecha o banco."""
+        self.save()
+        self._conn.close()
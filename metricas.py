@@ -0,0 +1,114 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+# Quantidade de faixas do histograma de latência (potências de 2 em microssegundos)
+HISTOGRAM_BUCKETS = 32
+
+# Etapa que envolve as demais etapas de cada arquivo (rota, pastas, comparação, transferência e log)
+TOTAL_STAGE = 'process'
+
+
+class RunMetrics:
+    """Temporizadores por etapa, contadores e histogramas de latência de uma execução.
+
+    As etapas registram tempo total, número de chamadas e um histograma em
+    faixas de potência de 2 (em microssegundos). É seguro para uso por várias
+    threads e pode ser combinado com métricas vindas de outros processos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zera todas as métricas."""
+        with self._lock:
+            self.started = time.time()
+            self.stages: Dict[str, Dict[str, Any]] = {}
+            self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Mede o tempo gasto no bloco e o registra na etapa `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        """Registra uma medição de duração para a etapa."""
+        bucket = min(int(seconds * 1_000_000).bit_length(), HISTOGRAM_BUCKETS - 1)
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {'count': 0, 'seconds': 0.0, 'max': 0.0,
+                                             'histogram': [0] * HISTOGRAM_BUCKETS}
+            stage['count'] += 1
+            stage['seconds'] += seconds
+            stage['max'] = max(stage['max'], seconds)
+            stage['histogram'][bucket] += 1
+
+    def add(self, counter: str, value: int = 1):
+        """Soma `value` ao contador."""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna uma cópia das métricas atuais."""
+        with self._lock:
+            return {
+                'elapsed': time.time() - self.started,
+                'stages': {name: {**stage, 'histogram': list(stage['histogram'])}
+                           for name, stage in self.stages.items()},
+                'counters': dict(self.counters)
+            }
+
+    def drain(self) -> Dict[str, Any]:
+        """Retorna as métricas acumuladas e as zera, para envio a outro processo."""
+        snapshot = self.snapshot()
+        self.reset()
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Incorpora métricas produzidas em outro processo."""
+        with self._lock:
+            for name, other in snapshot['stages'].items():
+                stage = self.stages.get(name)
+                if stage is None:
+                    self.stages[name] = {**other, 'histogram': list(other['histogram'])}
+                    continue
+                stage['count'] += other['count']
+                stage['seconds'] += other['seconds']
+                stage['max'] = max(stage['max'], other['max'])
+                stage['histogram'] = [a + b for a, b in zip(stage['histogram'], other['histogram'])]
+            for counter, value in snapshot['counters'].items():
+                self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def summary_text(self) -> str:
+        """Resumo curto para exibição na interface.
+
+        A etapa que envolve as outras aparece como total, fora da classificação,
+        para que o mesmo tempo não seja contado duas vezes.
+        """
+        snapshot = self.snapshot()
+        counters = snapshot['counters']
+        parts: List[str] = []
+        total = snapshot['stages'].get(TOTAL_STAGE)
+        if total:
+            parts.append(f"total por arquivo: {total['seconds']:.1f}s")
+        stages = sorted(((name, stage) for name, stage in snapshot['stages'].items() if name != TOTAL_STAGE),
+                        key=lambda item: item[1]['seconds'], reverse=True)
+        parts.extend(f"{name}: {stage['seconds']:.1f}s" for name, stage in stages[:4])
+        parts.append(f"lidos: {counters.get('bytes_read', 0) / (1024 * 1024):.1f} MB")
+        parts.append(f"gravados: {counters.get('bytes_written', 0) / (1024 * 1024):.1f} MB")
+        parts.append(f"hash: {counters.get('hash_bytes', 0) / (1024 * 1024):.1f} MB")
+        return " | ".join(parts)
+
+    def write_summary(self, path: str, extra: Dict[str, Any]):
+        """Grava o resumo da execução em JSON, junto com os dados de `extra`."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**extra, 'metrics': self.snapshot()}, f, indent=2, ensure_ascii=False)
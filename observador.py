@@ -0,0 +1,324 @@
+"""Modo de vigília: observa as pastas de origem e entrega os arquivos que chegam.
+
+No Linux os eventos vêm do inotify, acessado via ctypes; em outros sistemas,
+ou quando o inotify não está disponível, apenas a reconciliação periódica
+detecta os arquivos novos.
+"""
+import os
+import sys
+import stat
+import time
+import queue
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
+import logging
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from io_arquivos import TEMP_DIR_NAME
+from manifesto import RunManifest
+from processador import FileScanner, ScannedFile
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# Cabeçalho de struct inotify_event: wd, mask, cookie, len
+_EVENT = struct.Struct("iIII")
+
+# Intervalo de reconciliação usado quando não há inotify, em segundos
+POLL_INTERVAL = 30.0
+
+
+class Inotify:
+    """Acesso mínimo à API inotify do Linux."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify só está disponível no Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._add_watch.restype = ctypes.c_int
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        """Passa a observar uma pasta e retorna o descritor da observação."""
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def read(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """Aguarda até `timeout` segundos e retorna os eventos como (wd, mask, nome)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """Fonte contínua de arquivos novos ou alterados nas pastas de origem.
+
+    Um arquivo só é entregue depois de `debounce` segundos sem novos eventos;
+    se ele não foi fechado pelo escritor, o tamanho e o mtime também precisam
+    se manter estáveis entre duas verificações. A reconciliação percorre as
+    origens ao iniciar e a cada `reconcile_interval` segundos para recuperar
+    eventos perdidos. Com o `manifest` do destino, a reconciliação só entrega
+    os arquivos novos ou alterados desde a última execução, em vez de
+    reenviar todas as origens a cada passada. Como o FileScanner, a instância é iterável e pode
+    ser passada a FileProcessor.process_entries; quando não há arquivos
+    prontos, a iteração produz None para que os resultados em andamento
+    sejam entregues.
+    """
+
+    TICK = 0.5
+
+    def __init__(self, sources: List[str], exclude: Iterable[str] = (), debounce: float = 2.0,
+                 reconcile_interval: float = 3600.0, queue_size: int = 10_000,
+                 logger: Optional[logging.Logger] = None, manifest: Optional[RunManifest] = None):
+        self.sources = sources
+        self.exclude = {os.path.abspath(path) for path in exclude if path}
+        self.debounce = debounce
+        self.reconcile_interval = reconcile_interval
+        self.discovered = 0
+        self.logger = logger or logging.getLogger("FileProcessor")
+        # Usado só pela thread de reconciliação, com uma conexão própria ao banco
+        self.manifest = manifest
+        self.inotify: Optional[Inotify] = None
+        self._ready: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        # caminho -> [prazo, origem, fechado, tamanho, mtime_ns]
+        self._pending: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._watches: Dict[int, Tuple[str, str]] = {}
+        self._watch_limit_reached = False
+        self._scan_requests: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def idle(self) -> bool:
+        """Indica se não há arquivos prontos aguardando processamento."""
+        return self._ready.empty()
+
+    def start(self) -> "FolderWatcher":
+        """Registra as observações e inicia as threads de eventos e de reconciliação."""
+        try:
+            self.inotify = Inotify()
+        except (OSError, AttributeError) as e:
+            self.logger.warning(f"inotify indisponível, usando apenas varreduras periódicas: {str(e)}")
+            if not self.reconcile_interval or self.reconcile_interval > POLL_INTERVAL:
+                self.reconcile_interval = POLL_INTERVAL
+        if self.inotify:
+            for source in self.sources:
+                self._add_tree(source, source)
+        # A primeira reconciliação entrega o que já estava nas origens
+        self._scan_requests.put(None)
+        for target, name in ((self._watch_loop, "FolderWatcher"), (self._reconcile_loop, "FolderReconciler")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info(f"Observando {len(self.sources)} pasta(s) de origem ({len(self._watches)} observações)")
+        return self
+
+    def stop(self):
+        """Interrompe a observação e libera as threads."""
+        self._stop.set()
+        try:
+            while True:
+                self._ready.get_nowait()
+        except queue.Empty:
+            pass
+        for thread in self._threads:
+            thread.join(timeout=5)
+        if self.inotify:
+            self.inotify.close()
+            self.inotify = None
+        if self.manifest:
+            self.manifest.close()
+            self.manifest = None
+
+    def __iter__(self) -> Iterator[Optional[ScannedFile]]:
+        if not self._threads:
+            self.start()
+        while not self._stop.is_set():
+            try:
+                yield self._ready.get(timeout=self.TICK)
+            except queue.Empty:
+                yield None
+
+    def _excluded(self, path: str) -> bool:
+        return os.path.basename(path) == TEMP_DIR_NAME or os.path.abspath(path) in self.exclude
+
+    def _add_tree(self, root: str, source: str):
+        """Observa a pasta e todas as subpastas, sem seguir links."""
+        stack = [root]
+        while stack and not self._watch_limit_reached:
+            directory = stack.pop()
+            try:
+                wd = self.inotify.add_watch(directory)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    self._watch_limit_reached = True
+                    self.logger.warning("Limite de observações do inotify atingido; "
+                                        "as pastas restantes dependem da reconciliação periódica")
+                continue
+            self._watches[wd] = (directory, source)
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False) and not self._excluded(entry.path):
+                            stack.append(entry.path)
+            except OSError as e:
+                self.logger.warning(f"Não foi possível ler a pasta {directory}: {str(e)}")
+
+    def _watch_loop(self):
+        try:
+            while not self._stop.is_set():
+                if self.inotify:
+                    self._handle_events(self.inotify.read(self.TICK))
+                else:
+                    self._stop.wait(self.TICK)
+                self._release_pending()
+        except Exception as e:
+            self.logger.error(f"Erro na observação das pastas: {str(e)}")
+
+    def _handle_events(self, events: List[Tuple[int, int, str]]):
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                self.logger.warning("Fila de eventos do inotify transbordou; agendando reconciliação")
+                self._scan_requests.put(None)
+                continue
+            watched = self._watches.get(wd)
+            if watched is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._watches[wd]
+                continue
+            if not name:
+                continue
+            directory, source = watched
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                # Pasta criada ou movida para dentro da origem: observa e varre o conteúdo
+                if mask & (IN_CREATE | IN_MOVED_TO) and not self._excluded(path):
+                    self._add_tree(path, source)
+                    self._scan_requests.put((path, source))
+                continue
+            self._touch(path, source, closed=bool(mask & (IN_CLOSE_WRITE | IN_MOVED_TO)))
+
+    def _touch(self, path: str, source: str, closed: bool):
+        """Adia a entrega do arquivo até que ele fique `debounce` segundos sem eventos."""
+        deadline = time.monotonic() + self.debounce
+        with self._lock:
+            info = self._pending.get(path)
+            if info is None:
+                self._pending[path] = [deadline, source, closed, -1, -1]
+            else:
+                info[0] = deadline
+                info[2] = closed
+
+    def _release_pending(self):
+        """Entrega os arquivos cujo prazo venceu e que não estão mais sendo gravados."""
+        now = time.monotonic()
+        with self._lock:
+            due = [(path, info) for path, info in self._pending.items() if info[0] <= now]
+        for path, info in due:
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            with self._lock:
+                if self._pending.get(path) is not info or info[0] > now:
+                    continue  # Chegou um novo evento durante a verificação
+                if st is None or not stat.S_ISREG(st.st_mode):
+                    del self._pending[path]
+                    continue
+                if not info[2] and (st.st_size, st.st_mtime_ns) != (info[3], info[4]):
+                    info[0] = now + self.debounce
+                    info[3], info[4] = st.st_size, st.st_mtime_ns
+                    continue
+                del self._pending[path]
+            self._deliver(ScannedFile(path, os.path.dirname(path), info[1], st))
+
+    def _reconcile_loop(self):
+        next_full = time.monotonic() + self.reconcile_interval if self.reconcile_interval else None
+        while not self._stop.is_set():
+            timeout = self.TICK * 2
+            if next_full is not None:
+                timeout = min(timeout, max(next_full - time.monotonic(), 0))
+            try:
+                request = self._scan_requests.get(timeout=timeout)
+            except queue.Empty:
+                if next_full is None or time.monotonic() < next_full:
+                    continue
+                request = None
+            try:
+                if request is None:
+                    self._reconcile([(source, source) for source in self.sources])
+                    if self.reconcile_interval:
+                        next_full = time.monotonic() + self.reconcile_interval
+                else:
+                    self._reconcile([request])
+            except Exception as e:
+                self.logger.error(f"Erro na reconciliação das pastas: {str(e)}")
+
+    def _reconcile(self, roots: List[Tuple[str, str]]):
+        """Varre as pastas e entrega os arquivos; os modificados há pouco passam pelo debounce."""
+        sources = dict(roots)
+        scanner = FileScanner(list(sources), logger=self.logger, exclude=self.exclude)
+        cutoff = time.time() - self.debounce
+        for entry in scanner.scan():
+            if self._stop.is_set():
+                return
+            entry = entry._replace(source=sources[entry.source])
+            with self._lock:
+                if entry.path in self._pending:
+                    continue
+            if self.manifest and self.manifest.check(entry.path, entry.stat) == RunManifest.UNCHANGED:
+                continue
+            if entry.stat.st_mtime > cutoff:
+                self._touch(entry.path, entry.source, closed=False)
+            else:
+                self._deliver(entry)
+
+    def _deliver(self, entry: ScannedFile):
+        with self._lock:
+            self.discovered += 1
+        while not self._stop.is_set():
+            try:
+                self._ready.put(entry, timeout=self.TICK)
+                return
+            except queue.Full:
+                continue
@@ -0,0 +1,328 @@
+"""Simulação de uma execução: plano de operações calculado só com metadados.
+
+O plano prevê, para cada arquivo, se ele será transferido, renomeado por
+conflito de nome, atualizado sobre a cópia de uma execução anterior ou
+provavelmente ignorado como duplicado, além do espaço
+necessário no destino e do tempo estimado. Ele pode ser gravado em JSONL e
+executado depois sem varrer as origens novamente.
+"""
+import os
+import json
+import shutil
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from manifesto import RunManifest
+from processador import FileProcessor, FileScanner, ScannedFile, LOG_DIR
+from registro_nomes import NameRegistry
+
+# Quantidade de resumos recentes usados para medir a vazão
+HISTORY_RUNS = 20
+
+
+class PlannedFile(NamedTuple):
+    """Operação prevista para um arquivo de origem."""
+    file: ScannedFile
+    action: str
+    dest_path: str
+
+
+class RunPlan:
+    """Plano de uma execução, com as operações previstas e os totais."""
+
+    TRANSFER = 'transfer'
+    RENAME = 'rename'
+    DUPLICATE = 'duplicate'
+    UNCHANGED = 'unchanged'
+    UPDATE = 'update'
+
+    def __init__(self, params: Dict[str, Any], files: Optional[List[PlannedFile]] = None,
+                 totals: Optional[Dict[str, Any]] = None):
+        self.params = params
+        self.files: List[PlannedFile] = files or []
+        self.totals: Dict[str, Any] = totals or {}
+        # Arquivos alterados ou removidos entre a simulação e a execução
+        self.drift = {'changed': 0, 'missing': 0}
+        self.logger = logging.getLogger("FileProcessor")
+
+    @property
+    def sources(self) -> List[str]:
+        return self.params['sources']
+
+    @property
+    def model(self) -> Optional[str]:
+        return self.params['model']
+
+    @property
+    def destination(self) -> str:
+        return self.params['destination']
+
+    @property
+    def discovered(self) -> int:
+        return len(self.files) - self.drift['missing']
+
+    def __iter__(self) -> Iterator[ScannedFile]:
+        """Gera os arquivos do plano na ordem da varredura, como o FileScanner.
+
+        Cada arquivo é consultado de novo com stat (sem ler o conteúdo): o stat
+        gravado no plano é a chave do índice de hashes e, se o arquivo mudou
+        desde a simulação, devolveria o hash do conteúdo antigo. Os arquivos
+        alterados e os que não existem mais são contados em `drift`.
+        """
+        self.drift = {'changed': 0, 'missing': 0}
+        for planned in self.files:
+            entry = planned.file
+            try:
+                st = os.stat(entry.path)
+            except OSError:
+                self.drift['missing'] += 1
+                self.logger.warning(f"Arquivo do plano não existe mais: {entry.path}")
+                continue
+            if (st.st_size, st.st_mtime_ns) != (entry.stat.st_size, entry.stat.st_mtime_ns):
+                self.drift['changed'] += 1
+                self.logger.warning(f"Arquivo alterado desde a simulação: {entry.path}")
+            yield entry._replace(stat=st)
+
+    def stop(self):
+        """Nada a interromper: os arquivos já estão no plano. Mantido pela compatibilidade com o FileScanner."""
+
+    def save(self, path: str):
+        """Grava o plano em JSONL: o cabeçalho com parâmetros e totais, depois um arquivo por linha."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(_dumps({'o': 'plan', 'params': self.params, 'totals': self.totals}))
+            for entry, action, dest_path in self.files:
+                st = entry.stat
+                f.write(_dumps({
+                    'o': 'f', 'p': entry.path, 'r': entry.root, 's': entry.source,
+                    'st': [st.st_mode, st.st_ino, st.st_dev, st.st_nlink, st.st_size, st.st_mtime_ns],
+                    'a': action, 'd': dest_path
+                }))
+
+    @classmethod
+    def load(cls, path: str) -> "RunPlan":
+        """Lê um plano gravado por save()."""
+        plan = None
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record['o'] == 'plan':
+                    plan = cls(record['params'], totals=record['totals'])
+                elif record['o'] == 'f' and plan is not None:
+                    entry = ScannedFile(record['p'], record['r'], record['s'], _stat_result(*record['st']))
+                    plan.files.append(PlannedFile(entry, record['a'], record['d']))
+        if plan is None:
+            raise ValueError(f"Arquivo de plano inválido: {path}")
+        return plan
+
+    def summary_text(self) -> str:
+        """Resume o plano em poucas linhas para exibição."""
+        t = self.totals
+        lines = [
+            f"Arquivos: {t['files']} | Transferir: {t['transfer']} | Renomear: {t['rename']}"
+            f" | Atualizar: {t.get('update', 0)} | Prováveis duplicados: {t['duplicate']}"
+            f" | Inalterados: {t['unchanged']}",
+            f"Bytes a transferir: {_format_bytes(t['bytes_transfer'])}"
+            f" | Espaço necessário: {_format_bytes(t['bytes_required'])}"
+            f" | Livre no destino: {_format_bytes(t['free_space'])}",
+        ]
+        if not t['fits']:
+            lines.append("ATENÇÃO: o espaço livre no destino é insuficiente")
+        if t['eta_seconds'] is None:
+            lines.append("Tempo estimado: sem histórico de execuções para estimar")
+        else:
+            lines.append(f"Tempo estimado: {_format_duration(t['eta_seconds'])}")
+        return "\n".join(lines)
+
+
+def build_plan(processor: FileProcessor, sources: List[str], model: Optional[str],
+               destination: str) -> RunPlan:
+    """Varre as origens uma vez, só com stat, e simula a execução no destino.
+
+    Os conflitos seguem a mesma regra de nomes do processamento real
+    (NameRegistry). Como o conteúdo não é lido, um nome já ocupado por um
+    arquivo com o mesmo tamanho e mtime (preservado nas cópias) é contado
+    como provável duplicado; os demais, como renomeação. Assim o espaço
+    necessário é uma estimativa conservadora.
+    """
+    logger = processor.logger
+    plan = RunPlan({
+        'sources': list(sources),
+        'model': model,
+        'destination': destination,
+        'mode': processor.mode,
+        'incremental': processor.incremental,
+        'dedupe': processor.dedupe,
+        'hash_algorithm': processor.hash_algorithm,
+        'created': datetime.now().isoformat(timespec='seconds')
+    })
+    names = NameRegistry()
+    planned: Dict[str, Tuple[int, int]] = {}
+    manifest = RunManifest.for_destination(LOG_DIR, destination) if processor.incremental else None
+    dest_dev = _device_of(destination)
+    counts = {RunPlan.TRANSFER: 0, RunPlan.RENAME: 0, RunPlan.UPDATE: 0, RunPlan.DUPLICATE: 0,
+              RunPlan.UNCHANGED: 0}
+    bytes_transfer = bytes_required = bytes_duplicate = 0
+
+    try:
+        scanner = FileScanner(sources, logger=logger, exclude=[destination])
+        for entry in scanner.scan():
+            state = manifest.check(entry.path, entry.stat) if manifest else None
+            if state == RunManifest.UNCHANGED:
+                plan.files.append(PlannedFile(entry, RunPlan.UNCHANGED, manifest.get_destination(entry.path)))
+                counts[RunPlan.UNCHANGED] += 1
+                continue
+            previous = manifest.get_destination(entry.path) if state == RunManifest.CHANGED else None
+            if previous and processor.mode != 'move' and os.path.exists(previous):
+                # Arquivo alterado: a cópia anterior é substituída no mesmo nome
+                plan.files.append(PlannedFile(entry, RunPlan.UPDATE, previous))
+                counts[RunPlan.UPDATE] += 1
+                bytes_transfer += entry.stat.st_size
+                bytes_required += entry.stat.st_size
+                continue
+
+            route = processor.route_file(model, entry.name)
+            if route is None:
+                route = os.path.relpath(entry.root, entry.source)
+            dest_path = os.path.join(destination, route, entry.name)
+            size = entry.stat.st_size
+
+            action = RunPlan.TRANSFER
+            if names.exists(dest_path):
+                if _occupant(dest_path, planned) == (size, entry.stat.st_mtime_ns):
+                    action = RunPlan.DUPLICATE
+                else:
+                    action = RunPlan.RENAME
+            if action == RunPlan.DUPLICATE:
+                bytes_duplicate += size
+            else:
+                dest_path = names.reserve(dest_path)
+                names.commit(dest_path)
+                planned[dest_path] = (size, entry.stat.st_mtime_ns)
+                bytes_transfer += size
+                if processor.mode == 'copy' or entry.stat.st_dev != dest_dev:
+                    bytes_required += size
+            counts[action] += 1
+            plan.files.append(PlannedFile(entry, action, dest_path))
+    finally:
+        if manifest:
+            manifest.close()
+
+    free_space = shutil.disk_usage(_existing_ancestor(destination)).free
+    active = len(plan.files) - counts[RunPlan.UNCHANGED]
+    plan.totals = {
+        'files': len(plan.files),
+        **counts,
+        'bytes_transfer': bytes_transfer,
+        'bytes_duplicate': bytes_duplicate,
+        'bytes_required': bytes_required,
+        'free_space': free_space,
+        'fits': bytes_required <= free_space,
+        'eta_seconds': estimate_seconds(active, bytes_transfer, processor.mode, LOG_DIR, logger)
+    }
+    logger.info(f"Plano calculado: {plan.totals}")
+    return plan
+
+
+def estimate_seconds(files: int, total_bytes: int, mode: str, log_dir: str,
+                     logger: Optional[logging.Logger] = None) -> Optional[float]:
+    """Estima a duração pela vazão medida nos resumos das execuções recentes do mesmo modo.
+
+    Usa o maior entre o tempo por arquivos e o tempo por bytes; retorna None
+    quando não há histórico.
+    """
+    runs = _recent_summaries(log_dir, mode, logger)
+    elapsed = sum(run['elapsed'] for run in runs)
+    if not runs or elapsed <= 0:
+        return None
+    run_files = sum(run['files'] for run in runs)
+    run_bytes = sum(run['bytes'] for run in runs)
+    estimates = []
+    if run_files:
+        estimates.append(files / (run_files / elapsed))
+    if run_bytes:
+        estimates.append(total_bytes / (run_bytes / elapsed))
+    return round(max(estimates), 1) if estimates else None
+
+
+def _recent_summaries(log_dir: str, mode: str, logger: Optional[logging.Logger]) -> List[Dict[str, float]]:
+    try:
+        names = sorted((n for n in os.listdir(log_dir) if n.startswith("resumo_") and n.endswith(".json")),
+                       reverse=True)
+    except FileNotFoundError:
+        return []
+    runs = []
+    for name in names:
+        if len(runs) >= HISTORY_RUNS:
+            break
+        try:
+            with open(os.path.join(log_dir, name), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get('mode') != mode:
+                continue
+            status = data['summary']['status']
+            runs.append({
+                'elapsed': data['metrics']['elapsed'],
+                'files': status['success'] + status['skipped'] + status['error'],
+                'bytes': data['metrics']['counters'].get('bytes_written', 0)
+            })
+        except (OSError, ValueError, KeyError) as e:
+            if logger:
+                logger.warning(f"Resumo ignorado na estimativa de tempo: {name} ({str(e)})")
+    return runs
+
+
+def _occupant(dest_path: str, planned: Dict[str, Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+    """Tamanho e mtime do arquivo que ocupa o nome: previsto neste plano ou já presente no destino."""
+    if dest_path in planned:
+        return planned[dest_path]
+    try:
+        st = os.stat(dest_path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _existing_ancestor(path: str) -> str:
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def _device_of(path: str) -> int:
+    return os.stat(_existing_ancestor(path)).st_dev
+
+
+def _stat_result(mode: int, ino: int, dev: int, nlink: int, size: int, mtime_ns: int) -> os.stat_result:
+    """Reconstrói o stat gravado no plano, com os campos usados pelo processamento."""
+    mtime = mtime_ns / 1e9
+    return os.stat_result((mode, ino, dev, nlink, 0, 0, size, int(mtime), int(mtime), int(mtime),
+                           mtime, mtime, mtime, mtime_ns, mtime_ns, mtime_ns))
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _format_bytes(value: int) -> str:
+    size = float(value)
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if size < 1024 or unit == "TiB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{value} B"
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}min"
+    if minutes:
+        return f"{minutes}min{secs:02d}s"
+    return f"{secs}s"
@@ -1,90 +1,889 @@
 import os
+import errno
+import queue
 import shutil
+import tempfile
+import pstats
+import cProfile
 import logging
-import hashlib
+import threading
+import multiprocessing.util
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from comparador import FileComparator, new_hasher
+from deduplicador import DEDUPE_MODES, DuplicateGroups
+from diario import JobJournal
+from indice_hash import HashIndex
+from limitador import RateLimiter, SharedLimits
+from io_arquivos import (TEMP_DIR_NAME, clean_temp_dir, clone_file, commit_temp, copy_file, rename_no_replace,
+                         temp_path_for)
+from logs import setup_logging, shutdown_logging
+from manifesto import RunManifest
+from metricas import RunMetrics
+from registro_nomes import NameRegistry
+from roteador import ModelRouter, load_router
+
+LOG_DIR = os.path.expanduser("~/OrganizadorLogs")
+
+# Modos de operação suportados pelo processador
+MODES = ('copy', 'move', 'hardlink')
+
+# Erros do FICLONE que indicam falta de suporte a reflinks no destino
+_REFLINK_UNSUPPORTED = {errno.EOPNOTSUPP, errno.ENOTSUP, errno.EXDEV, errno.EINVAL, errno.ENOTTY}
+
+
+class ScannedFile(NamedTuple):
+    """Arquivo encontrado pelo scanner, com o stat já obtido do os.scandir."""
+    path: str
+    root: str
+    source: str
+    stat: os.stat_result
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+
+class FileScanner:
+    """Percorre as pastas de origem uma única vez usando os.scandir.
+
+    Os arquivos são entregues à medida que são encontrados, e o atributo
+    `discovered` mantém o total descoberto até o momento, permitindo que o
+    progresso e a cópia comecem antes do fim da varredura.
+    """
+
+    _DONE = object()
+
+    def __init__(self, sources: List[str], queue_size: int = 100_000,
+                 logger: Optional[logging.Logger] = None, exclude: Iterable[str] = ()):
+        self.sources = sources
+        self.exclude = {os.path.abspath(path) for path in exclude if path}
+        self.discovered = 0
+        self.finished = False
+        self.logger = logger or logging.getLogger("FileProcessor")
+        self.metrics = RunMetrics()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def scan(self) -> Iterator[ScannedFile]:
+        """Gera os arquivos das origens de forma síncrona, sem seguir links."""
+        for source in self.sources:
+            stack = [source]
+            while stack:
+                if self._stop.is_set():
+                    return
+                root = stack.pop()
+                try:
+                    with self.metrics.stage('scan'), os.scandir(root) as it:
+                        entries = sorted(it, key=lambda e: e.name)
+                except OSError as e:
+                    self.logger.warning(f"Não foi possível ler a pasta {root}: {str(e)}")
+                    continue
+
+                subdirs = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name != TEMP_DIR_NAME and not self._excluded(entry.path):
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            self.discovered += 1
+                            yield ScannedFile(entry.path, root, source, entry.stat())
+                    except OSError as e:
+                        self.logger.warning(f"Não foi possível ler {entry.path}: {str(e)}")
+                # Empilha em ordem reversa para visitar as subpastas em ordem alfabética
+                stack.extend(reversed(subdirs))
+
+    def _excluded(self, path: str) -> bool:
+        return bool(self.exclude) and os.path.abspath(path) in self.exclude
+
+    def start(self) -> "FileScanner":
+        """Inicia a varredura em segundo plano, alimentando a fila interna."""
+        self._thread = threading.Thread(target=self._run, name="FileScanner", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Interrompe a varredura e libera a thread produtora."""
+        self._stop.set()
+        # Esvazia a fila para desbloquear um put() pendente
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _run(self):
+        try:
+            for item in self.scan():
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        finally:
+            self.finished = True
+            while True:
+                try:
+                    self._queue.put(self._DONE, timeout=0.1)
+                    break
+                except queue.Full:
+                    if self._stop.is_set():
+                        self.stop()
+
+    def __iter__(self) -> Iterator[ScannedFile]:
+        if self._thread is None:
+            self.start()
+        while True:
+            item = self._queue.get()
+            if item is self._DONE or self._stop.is_set():
+                return
+            yield item
+
+
+# Processador usado por cada processo do pool quando o modo de processos está ativo
+_worker_processor: Optional["FileProcessor"] = None
+
+
+def _init_worker(config: Dict[str, Any], profile_dir: Optional[str] = None,
+                 shared_limits: Optional[SharedLimits] = None):
+    """Cria o processador local de um processo trabalhador."""
+    global _worker_processor
+    _worker_processor = FileProcessor(**config)
+    if shared_limits is not None:
+        # Acompanha as alterações de vazão feitas no processo principal durante a execução
+        _worker_processor.limiter.follow(shared_limits)
+    if profile_dir:
+        # O perfil do processo é combinado pelo processo principal ao fim da execução
+        multiprocessing.util.Finalize(None, _worker_processor._dump_worker_profile, args=(profile_dir,),
+                                      exitpriority=20)
+    # Garante que o índice de hashes e o log sejam gravados quando o processo terminar
+    multiprocessing.util.Finalize(None, _worker_processor.close, exitpriority=10)
+    multiprocessing.util.Finalize(None, shutdown_logging, exitpriority=0)
+
+
+def _process_in_worker(args: tuple) -> Dict[str, Any]:
+    """Executa process_file dentro de um processo trabalhador, devolvendo também as métricas."""
+    result = _worker_processor._call_process_file(*args)
+    result['metrics'] = _worker_processor.metrics.drain()
+    return result
+
 
 class FileProcessor:
-    def __init__(self):
+    def __init__(self, use_hash_index: bool = True, hash_index_path: Optional[str] = None,
+                 hash_algorithm: str = 'sha256', mode: str = 'copy', incremental: bool = False,
+                 profile: bool = False, structured_log: bool = False, dedupe: Optional[str] = None,
+                 max_bytes_per_second: float = 0, max_files_per_second: float = 0,
+                 busy_threshold: Optional[float] = None):
         """Inicializa o processador de arquivos e configura o logger."""
+        if mode not in MODES:
+            raise ValueError(f"Modo de operação inválido: {mode}")
+        if dedupe is not None and dedupe not in DEDUPE_MODES:
+            raise ValueError(f"Modo de deduplicação inválido: {dedupe}")
+        self.structured_log = structured_log
         self.logger = self.setup_logger()
+        self.mode = mode
+        self.use_hash_index = use_hash_index
+        self.hash_index_path = hash_index_path or os.path.join(LOG_DIR, "indice_hashes.sqlite3")
+        self.hash_index = HashIndex(self.hash_index_path) if use_hash_index else None
+        self.hash_algorithm = hash_algorithm
+        self.metrics = RunMetrics()
+        self.comparator = FileComparator(hash_algorithm, self.hash_index, logger=self.logger,
+                                         metrics=self.metrics)
+        self.incremental = incremental
+        self.dedupe = dedupe
+        self.limiter = RateLimiter(max_bytes_per_second, max_files_per_second, busy_threshold, logger=self.logger)
+        self._duplicates: Optional[DuplicateGroups] = None
+        self._reflink_unsupported = False
+        self.run_summary = self._empty_summary()
+        self._routers: Dict[str, ModelRouter] = {}
+        self.names = NameRegistry()
+        self.profile = profile
+        self.last_summary_path: Optional[str] = None
+        self._profilers: List[cProfile.Profile] = []
+        self._profiler_local = threading.local()
+        self._profile_dir: Optional[str] = None
         
     def setup_logger(self) -> logging.Logger:
-        """Configura o logger para registrar as atividades do processador de arquivos."""
-        logger = logging.getLogger("FileProcessor")
-        logger.setLevel(logging.INFO)
-        
-        log_dir = os.path.expanduser("~/OrganizadorLogs")
-        os.makedirs(log_dir, exist_ok=True)
-        
-        log_file = os.path.join(log_dir, f"processamento_{datetime.now().strftime('%Y%m%d')}.log")
-        file_handler = logging.FileHandler(log_file)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        
-        logger.addHandler(file_handler)
-        return logger
+        """Configura o logger assíncrono do processador de arquivos; pode ser chamado várias vezes."""
+        # Processos filhos compartilham o arquivo de log; só o processo principal faz a rotação
+        rotate = multiprocessing.current_process().name == "MainProcess"
+        return setup_logging(LOG_DIR, structured=self.structured_log, rotate=rotate)
 
     def calculate_total_files(self, sources: List[str]) -> int:
         """Calcula o número total de arquivos nas pastas de origem."""
-        total = 0
-        for source in sources:
-            for root, _, files in os.walk(source):
-                total += len(files)
-        return total
-
-    def process_file(self, file_path: str, root: str, source: str, model: str, destination: str) -> Dict[str, Any]:
-        """Processa um único arquivo, movendo-o para o destino e evitando duplicados."""
+        return sum(1 for _ in FileScanner(sources, logger=self.logger).scan())
+
+    def scan_files(self, sources: List[str], destination: Optional[str] = None) -> FileScanner:
+        """Inicia a varredura em fluxo das pastas de origem, sem entrar no destino se ele estiver dentro de uma delas."""
+        return FileScanner(sources, logger=self.logger, exclude=[destination]).start()
+
+    def process_entries(self, entries: Iterable[ScannedFile], model: str, destination: str,
+                        workers: int = 1, use_processes: bool = False,
+                        cancel_event: Optional[threading.Event] = None,
+                        max_pending: Optional[int] = None,
+                        journal: Optional[JobJournal] = None,
+                        progress: Optional[Callable[[str, int, int], None]] = None
+                        ) -> Iterator[Tuple[ScannedFile, Dict[str, Any]]]:
+        """Processa os arquivos com um pool de trabalhadores, devolvendo os resultados em ordem.
+
+        No máximo `max_pending` arquivos ficam em andamento ao mesmo tempo, de
+        modo que a fila entre o scanner e os trabalhadores é limitada. No modo
+        incremental, os arquivos inalterados segundo o manifesto do destino são
+        ignorados antes de qualquer acesso ao destino. Com um `journal`, cada
+        arquivo é registrado no diário do trabalho e os já concluídos em uma
+        execução interrompida não são refeitos. Entradas None são aceitas como
+        pulsos de uma fonte contínua, como o FolderWatcher, e apenas liberam os
+        resultados já concluídos.
+
+        Com `dedupe`, todas as entradas são lidas antes do processamento para
+        agrupar os arquivos idênticos entre as origens, e o processamento usa
+        threads, pois os duplicados aguardam o arquivo principal do grupo.
+        Durante esse agrupamento, `progress` recebe a etapa, os arquivos lidos
+        e o total, já que ainda não há resultados a entregar.
+        """
+        cancel_event = cancel_event or threading.Event()
+        self.run_summary = self._empty_summary()
+        self.metrics.reset()
+        self._profilers = []
+        self._profiler_local = threading.local()
+        self.names.clear()
+        if model:
+            # Revalida o índice do modelo uma vez por execução
+            self._routers[model] = load_router(model, LOG_DIR, self.logger)
+        manifest = RunManifest.for_destination(LOG_DIR, destination) if self.incremental else None
+
+        completed = False
+        runner = None
+        try:
+            work = entries
+            if self.dedupe:
+                if use_processes:
+                    self.logger.warning("A deduplicação global usa threads; o modo de processos foi ignorado")
+                    use_processes = False
+                work = self._group_duplicates(entries, workers, manifest, journal, cancel_event, progress)
+            runner = self._run_entries(work, model, destination, workers, use_processes,
+                                       cancel_event, max_pending, manifest, journal)
+            for entry, result in runner:
+                if 'metrics' in result:
+                    self.metrics.merge(result.pop('metrics'))
+                self._count_result(result)
+                if manifest and result['status'] in ('success', 'skipped'):
+                    manifest.record(entry.path, entry.stat, result['dest_path'])
+                if journal and result['status'] in ('success', 'skipped', 'unchanged'):
+                    journal.done(entry.path, result['status'], result.get('dest_path'))
+                yield entry, result
+            completed = not cancel_event.is_set()
+        finally:
+            if runner is not None:
+                # Encerra o pool já aqui, para que os perfis dos processos estejam gravados
+                runner.close()
+            if manifest:
+                manifest.close()
+            if journal:
+                if completed:
+                    journal.finish()
+                else:
+                    journal.close()
+            try:
+                os.rmdir(os.path.join(destination, TEMP_DIR_NAME))
+            except OSError:
+                pass
+            if isinstance(entries, FileScanner):
+                self.metrics.merge(entries.metrics.snapshot())
+            if self._duplicates is not None:
+                self.run_summary['dedupe'] = self._dedupe_summary()
+                self._duplicates = None
+            self.logger.info(f"Resumo da execução: {self.run_summary}")
+            self._write_run_summary(destination)
+            if self.profile:
+                self._dump_profile()
+
+    def _run_entries(self, entries: Iterable[ScannedFile], model: str, destination: str,
+                     workers: int, use_processes: bool, cancel_event: threading.Event,
+                     max_pending: Optional[int], manifest: Optional[RunManifest],
+                     journal: Optional[JobJournal]) -> Iterator[Tuple[ScannedFile, Dict[str, Any]]]:
+        if workers <= 1:
+            for entry in entries:
+                if cancel_event.is_set():
+                    return
+                if entry is None:
+                    continue
+                if journal and journal.is_completed(entry.path):
+                    yield entry, self._resumed_result()
+                    continue
+                state = self._manifest_state(entry, manifest)
+                if state == RunManifest.UNCHANGED:
+                    yield entry, self._unchanged_result()
+                    continue
+                if journal:
+                    journal.started(entry.path)
+                yield entry, self._call_process_file(entry.path, entry.root, entry.source, model, destination,
+                                                     entry.stat, self._replace_target(entry, manifest, state))
+            return
+
+        max_pending = max_pending or workers * 4
+        if use_processes:
+            if self.profile:
+                self._profile_dir = tempfile.mkdtemp(prefix="perfil_", dir=LOG_DIR)
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(self._worker_config(workers), self._profile_dir,
+                                                     self.limiter.share(workers)))
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="FileProcessor")
+
+        pending: deque = deque()
+        try:
+            for entry in entries:
+                if cancel_event.is_set():
+                    return
+                # Uma entrada None não traz arquivo; só entrega os resultados já prontos
+                if entry is not None:
+                    resumed = bool(journal and journal.is_completed(entry.path))
+                    state = None if resumed else self._manifest_state(entry, manifest)
+                    if resumed:
+                        future = Future()
+                        future.set_result(self._resumed_result())
+                    elif state == RunManifest.UNCHANGED:
+                        future = Future()
+                        future.set_result(self._unchanged_result())
+                    else:
+                        if journal:
+                            journal.started(entry.path)
+                        args = (entry.path, entry.root, entry.source, model, destination, entry.stat,
+                                self._replace_target(entry, manifest, state))
+                        if use_processes:
+                            future = executor.submit(_process_in_worker, args)
+                        else:
+                            future = executor.submit(self._call_process_file, *args)
+                    pending.append((entry, future))
+
+                # Entrega os resultados já prontos e bloqueia quando a fila enche
+                while pending and (len(pending) >= max_pending or pending[0][1].done()):
+                    entry_done, future_done = pending.popleft()
+                    result = self._wait_result(future_done, cancel_event)
+                    if result is None:
+                        return
+                    yield entry_done, result
+
+            while pending:
+                entry_done, future_done = pending.popleft()
+                result = self._wait_result(future_done, cancel_event)
+                if result is None:
+                    return
+                yield entry_done, result
+        finally:
+            if self._duplicates is not None:
+                # Duplicados à espera de um principal cancelado seguem sem vínculo
+                self._duplicates.release()
+            executor.shutdown(wait=True, cancel_futures=True)
+            if use_processes:
+                self.limiter.unshare()
+
+    def _group_duplicates(self, entries: Iterable[ScannedFile], workers: int,
+                          manifest: Optional[RunManifest], journal: Optional[JobJournal],
+                          cancel_event: threading.Event,
+                          progress: Optional[Callable[[str, int, int], None]]) -> List[ScannedFile]:
+        """Lê todas as entradas e agrupa as de conteúdo idêntico, deixando de fora as que não serão processadas."""
+        work = []
+        for entry in entries:
+            if cancel_event.is_set():
+                break
+            if entry is not None:
+                work.append(entry)
+        candidates = [
+            entry for entry in work
+            if not (journal and journal.is_completed(entry.path))
+            and not (manifest and manifest.check(entry.path, entry.stat) == RunManifest.UNCHANGED)
+        ]
+        with self.metrics.stage('dedupe'):
+            self._duplicates = DuplicateGroups.build(candidates, self.comparator, workers, self.logger,
+                                                     cancel_event, progress)
+        return work
+
+    def _dedupe_summary(self) -> Dict[str, Any]:
+        counters = self.metrics.snapshot()['counters']
+        return {
+            'groups': self._duplicates.groups,
+            'duplicates': len(self._duplicates.primary_of),
+            'linked': counters.get('dedupe_hardlinks', 0) + counters.get('dedupe_reflinks', 0),
+            'bytes_saved': counters.get('dedupe_bytes_saved', 0)
+        }
+
+    def _manifest_state(self, entry: ScannedFile, manifest: Optional[RunManifest]) -> Optional[str]:
+        """Consulta o manifesto e contabiliza o arquivo como novo, alterado ou inalterado."""
+        if manifest is None:
+            return None
+        state = manifest.check(entry.path, entry.stat)
+        key = 'skipped' if state == RunManifest.UNCHANGED else state
+        self.run_summary['incremental'][key] += 1
+        return state
+
+    def _replace_target(self, entry: ScannedFile, manifest: Optional[RunManifest],
+                        state: Optional[str]) -> Optional[str]:
+        """Destino gravado para um arquivo alterado, que deve ser substituído em vez de ganhar um novo nome.
+
+        No modo move a cópia anterior é a única que restou da versão antiga,
+        então ela é preservada e a nova versão segue o caminho normal.
+        """
+        if state != RunManifest.CHANGED or self.mode == 'move':
+            return None
+        return manifest.get_destination(entry.path)
+
+    def _unchanged_result(self) -> Dict[str, Any]:
+        return {
+            'status': 'unchanged',
+            'message': 'Arquivo inalterado desde a última execução'
+        }
+
+    def _resumed_result(self) -> Dict[str, Any]:
+        return {
+            'status': 'resumed',
+            'message': 'Arquivo já concluído antes da interrupção'
+        }
+
+    def _empty_summary(self) -> Dict[str, Any]:
+        return {
+            'status': {'success': 0, 'skipped': 0, 'unchanged': 0, 'resumed': 0, 'error': 0},
+            'incremental': {'new': 0, 'changed': 0, 'skipped': 0}
+        }
+
+    def _count_result(self, result: Dict[str, Any]):
+        status = self.run_summary['status']
+        status[result['status']] = status.get(result['status'], 0) + 1
+        self.metrics.add(f"files_{result['status']}")
+
+    def _call_process_file(self, *args) -> Dict[str, Any]:
+        """Chama process_file, sob o cProfile da thread atual quando o perfilamento está ativo."""
+        if not self.profile:
+            return self.process_file(*args)
+        profiler = getattr(self._profiler_local, 'profiler', None)
+        if profiler is None:
+            profiler = self._profiler_local.profiler = cProfile.Profile()
+            self._profilers.append(profiler)
+        return profiler.runcall(self.process_file, *args)
+
+    def _dump_profile(self):
+        """Combina os perfis das threads e dos processos trabalhadores e grava o resultado na pasta de logs."""
+        sources: List[Any] = list(self._profilers)
+        if self._profile_dir:
+            sources += sorted(os.path.join(self._profile_dir, name) for name in os.listdir(self._profile_dir))
+        try:
+            if not sources:
+                return
+            path = os.path.join(LOG_DIR, f"perfil_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.prof")
+            stats = pstats.Stats(sources[0])
+            for source in sources[1:]:
+                stats.add(source)
+            stats.dump_stats(path)
+            self.logger.info(f"Perfil de execução gravado em: {path}")
+        finally:
+            if self._profile_dir:
+                shutil.rmtree(self._profile_dir, ignore_errors=True)
+                self._profile_dir = None
+
+    def _dump_worker_profile(self, directory: str):
+        """Grava o perfil deste processo trabalhador para ser combinado pelo processo principal."""
+        if self._profilers:
+            stats = pstats.Stats(self._profilers[0])
+            for profiler in self._profilers[1:]:
+                stats.add(profiler)
+            stats.dump_stats(os.path.join(directory, f"{os.getpid()}.prof"))
+
+    def _write_run_summary(self, destination: str):
+        """Grava o resumo e as métricas da execução na pasta de logs."""
+        path = os.path.join(LOG_DIR, f"resumo_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json")
+        try:
+            self.metrics.write_summary(path, {
+                'destination': destination,
+                'mode': self.mode,
+                'summary': self.run_summary,
+                'comparisons': self.comparator.stats
+            })
+            self.last_summary_path = path
+        except OSError as e:
+            self.logger.warning(f"Não foi possível gravar o resumo da execução: {str(e)}")
+
+    def _wait_result(self, future: Future, cancel_event: threading.Event) -> Optional[Dict[str, Any]]:
+        """Aguarda o resultado de um trabalhador, retornando None se houver cancelamento."""
+        while True:
+            if cancel_event.is_set():
+                return None
+            try:
+                return future.result(timeout=0.1)
+            except FutureTimeout:
+                continue
+            except Exception as e:
+                self.logger.error(f"Erro no trabalhador: {str(e)}")
+                return {
+                    'status': 'error',
+                    'message': f"Erro: {str(e)}"
+                }
+
+    def _worker_config(self, workers: int = 1) -> Dict[str, Any]:
+        """Retorna os parâmetros para recriar este processador em outro processo.
+
+        Os limites de vazão são divididos entre os `workers` processos; as
+        alterações posteriores chegam a eles pelo SharedLimits passado ao
+        _init_worker.
+        """
+        limits = self.limiter.limits()
+        return {
+            'use_hash_index': self.use_hash_index,
+            'hash_index_path': self.hash_index_path,
+            'hash_algorithm': self.hash_algorithm,
+            'mode': self.mode,
+            'incremental': self.incremental,
+            'profile': self.profile,
+            'structured_log': self.structured_log,
+            'dedupe': self.dedupe,
+            'max_bytes_per_second': limits['bytes_per_second'] / workers,
+            'max_files_per_second': limits['files_per_second'] / workers,
+            'busy_threshold': self.limiter.busy_threshold
+        }
+
+    def create_journal(self, sources: List[str], model: Optional[str], destination: str) -> JobJournal:
+        """Cria o diário de um novo trabalho com os parâmetros atuais do processador."""
+        return JobJournal.create(LOG_DIR, {
+            'sources': sources,
+            'model': model,
+            'destination': destination,
+            'mode': self.mode,
+            'incremental': self.incremental,
+            'dedupe': self.dedupe,
+            'hash_algorithm': self.hash_algorithm
+        })
+
+    def resume_journal(self, path: Optional[str] = None) -> Optional[JobJournal]:
+        """Reabre o trabalho interrompido mais recente (ou o informado) e restaura seus parâmetros.
+
+        As cópias parciais deixadas no destino são removidas. Retorna None se
+        não houver trabalho a retomar.
+        """
+        path = path or JobJournal.find_unfinished(LOG_DIR)
+        if path is None:
+            return None
+        journal = JobJournal.resume(path)
+        params = journal.params
+        self.apply_job_params(params)
+        removed = clean_temp_dir(params['destination'])
+        self.logger.info(f"Retomando trabalho {path}: {len(journal.completed)} arquivos concluídos, "
+                         f"{removed} cópias parciais removidas")
+        return journal
+
+    def apply_job_params(self, params: Dict[str, Any]):
+        """Adota as opções gravadas em um diário ou plano, para executá-lo como foi definido."""
+        self.mode = params.get('mode', self.mode)
+        self.incremental = params.get('incremental', self.incremental)
+        self.dedupe = params.get('dedupe', self.dedupe)
+        algorithm = params.get('hash_algorithm', self.hash_algorithm)
+        if algorithm != self.hash_algorithm:
+            # Mesmo algoritmo do trabalho original, para que as comparações e o índice continuem válidos
+            new_hasher(algorithm)
+            self.hash_algorithm = self.comparator.algorithm = algorithm
+
+    def flush(self):
+        """Grava no disco o índice de hashes e registra as etapas de comparação."""
+        stats = ", ".join(f"{stage}={count}" for stage, count in self.comparator.stats.items())
+        self.logger.info(f"Comparações decididas por etapa: {stats}")
+        if self.hash_index:
+            self.hash_index.flush()
+
+    def close(self):
+        """Libera os recursos persistentes do processador."""
+        if self.hash_index:
+            self.hash_index.close()
+            self.hash_index = None
+
+    def process_file(self, file_path: str, root: str, source: str, model: str, destination: str,
+                     stat: Optional[os.stat_result] = None, replace_path: Optional[str] = None) -> Dict[str, Any]:
+        """Processa um único arquivo, movendo-o para o destino e evitando duplicados.
+
+        Com `replace_path`, a cópia gravada ali em uma execução anterior é
+        substituída atomicamente pela versão atual do arquivo.
+        """
+        if self.limiter.active:
+            # Hardlinks não movem dados; só contam como operação
+            size = stat.st_size if stat is not None and self.mode != 'hardlink' else 0
+            with self.metrics.stage('throttle'):
+                self.limiter.acquire(size)
+        with self.metrics.stage('process'):
+            result = None
+            if replace_path is not None:
+                result = self._update_file(file_path, replace_path, stat, destination)
+            if result is None:
+                result = self._process_file(file_path, root, source, model, destination, stat)
+        if self._duplicates is not None:
+            # Libera os duplicados que aguardam este arquivo, se ele for o principal de um grupo
+            written = result['status'] in ('success', 'skipped')
+            self._duplicates.publish(file_path, result.get('dest_path') if written else None)
+        return result
+
+    def _process_file(self, file_path: str, root: str, source: str, model: str, destination: str,
+                      stat: Optional[os.stat_result]) -> Dict[str, Any]:
         try:
             file_name = os.path.basename(file_path)
-            rel_path = os.path.relpath(root, source)
-            dest_dir = os.path.join(destination, rel_path)
+            with self.metrics.stage('route'):
+                route = self.route_file(model, file_name)
+            if route is None:
+                route = os.path.relpath(root, source)
+            dest_dir = os.path.join(destination, route)
             dest_path = os.path.join(dest_dir, file_name)
 
-            os.makedirs(dest_dir, exist_ok=True)
+            with self.metrics.stage('makedirs'):
+                self.names.ensure_directory(dest_dir)
 
             # Verifica duplicados
-            if os.path.exists(dest_path):
-                if self.file_hash(file_path) == self.file_hash(dest_path):
+            stage = None
+            if self.names.exists(dest_path):
+                with self.metrics.stage('compare'):
+                    equal, stage = self.comparator.compare(file_path, dest_path, stat)
+                if equal:
                     return {
                         'status': 'skipped',
-                        'message': 'Arquivo duplicado - conteúdo idêntico'
+                        'message': 'Arquivo duplicado - conteúdo idêntico',
+                        'stage': stage,
+                        'dest_path': dest_path
                     }
-                dest_path = self.generate_unique_name(dest_path)
 
-            shutil.copy2(file_path, dest_path)
-            
-            self.logger.info(f"Arquivo processado: {file_path} -> {dest_path}")
+            primary_dest = self._duplicate_target(file_path)
+            wanted_path = dest_path
+            while True:
+                # Sempre a partir do nome original, para que os sufixos não se acumulem (a_1_1.txt)
+                dest_path = self.generate_unique_name(wanted_path)
+                try:
+                    with self.metrics.stage('transfer'):
+                        message = None
+                        if primary_dest:
+                            message = self._link_duplicate(file_path, primary_dest, dest_path, stat, destination)
+                        if message is None:
+                            message = self.transfer_file(file_path, dest_path, stat, destination)
+                    self.names.commit(dest_path)
+                    break
+                except FileExistsError:
+                    # Nome ocupado por outro processo trabalhador
+                    self.names.discard(dest_path, occupied=True)
+                    if dest_path == wanted_path:
+                        # Pode ser o mesmo conteúdo vindo de outra origem; só então tenta o próximo sufixo
+                        with self.metrics.stage('compare'):
+                            equal, stage = self.comparator.compare(file_path, wanted_path, stat)
+                        if equal:
+                            return {
+                                'status': 'skipped',
+                                'message': 'Arquivo duplicado - conteúdo idêntico',
+                                'stage': stage,
+                                'dest_path': wanted_path
+                            }
+                    continue
+                except Exception:
+                    self.names.discard(dest_path)
+                    raise
+
+            with self.metrics.stage('log'):
+                self.logger.info("Arquivo processado (%s): %s -> %s", self.mode, file_path, dest_path)
             return {
                 'status': 'success',
-                'message': f"Arquivo movido para: {dest_path}"
+                'message': message,
+                'stage': stage,
+                'dest_path': dest_path
             }
 
         except Exception as e:
-            self.logger.error(f"Erro ao processar {file_path}: {str(e)}")
+            self.logger.error("Erro ao processar %s: %s", file_path, e)
             return {
                 'status': 'error',
                 'message': f"Erro: {str(e)}"
             }
 
-    def file_hash(self, file_path: str) -> str:
-        """Gera o hash SHA-256 de um arquivo."""
-        hash_sha256 = hashlib.sha256()
+    def _update_file(self, file_path: str, dest_path: str, stat: Optional[os.stat_result],
+                     temp_root: str) -> Optional[Dict[str, Any]]:
+        """Substitui a cópia anterior de um arquivo alterado; retorna None se ela não existir mais."""
+        try:
+            stat = stat or os.stat(file_path)
+            try:
+                dest_stat = os.stat(dest_path)
+            except FileNotFoundError:
+                return None
+            stage = None
+            equal = os.path.samestat(stat, dest_stat)  # hardlink editado no próprio lugar
+            if not equal:
+                with self.metrics.stage('compare'):
+                    equal, stage = self.comparator.compare(file_path, dest_path, stat, dest_stat)
+            if equal:
+                return {
+                    'status': 'skipped',
+                    'message': 'Arquivo alterado sem mudança de conteúdo',
+                    'stage': stage,
+                    'dest_path': dest_path
+                }
+
+            with self.metrics.stage('transfer'):
+                linked = False
+                if self.mode == 'hardlink':
+                    temp_path = temp_path_for(temp_root)
+                    try:
+                        os.link(file_path, temp_path)
+                        linked = True
+                    except OSError as e:
+                        self.logger.warning(f"Hardlink indisponível para {file_path} ({str(e)}), copiando")
+                    if linked:
+                        try:
+                            os.replace(temp_path, dest_path)
+                        except BaseException:
+                            os.unlink(temp_path)
+                            raise
+                if not linked:
+                    self._copy(file_path, dest_path, stat, temp_root, replace=True)
+
+            with self.metrics.stage('log'):
+                self.logger.info("Arquivo atualizado (%s): %s -> %s", self.mode, file_path, dest_path)
+            return {
+                'status': 'success',
+                'message': f"Arquivo atualizado em: {dest_path}",
+                'stage': stage,
+                'dest_path': dest_path
+            }
+
+        except Exception as e:
+            self.logger.error("Erro ao processar %s: %s", file_path, e)
+            return {
+                'status': 'error',
+                'message': f"Erro: {str(e)}"
+            }
+
+    def route_file(self, model: Optional[str], file_name: str) -> Optional[str]:
+        """Retorna a subpasta de destino definida pela pasta modelo, ou None para manter o caminho relativo."""
+        if not model:
+            return None
+        router = self._routers.get(model)
+        if router is None:
+            router = self._routers[model] = load_router(model, LOG_DIR, self.logger)
+        return router.route(file_name)
+
+    def transfer_file(self, file_path: str, dest_path: str, stat: Optional[os.stat_result] = None,
+                      temp_root: Optional[str] = None) -> str:
+        """Transfere o arquivo para o destino conforme o modo de operação e retorna a mensagem de resultado.
+
+        As cópias são escritas em um arquivo temporário dentro de `temp_root`
+        (por padrão, a pasta do destino) e renomeadas atomicamente ao final.
+        """
+        temp_root = temp_root or os.path.dirname(dest_path)
+        if self.mode == 'hardlink':
+            try:
+                os.link(file_path, dest_path)
+                return f"Vínculo criado em: {dest_path}"
+            except FileExistsError:
+                raise
+            except OSError as e:
+                # Origem e destino em volumes diferentes ou sistema sem suporte a hardlinks
+                self.logger.warning(f"Hardlink indisponível para {file_path} ({str(e)}), copiando")
+                self._copy(file_path, dest_path, stat, temp_root)
+                return f"Arquivo copiado para: {dest_path} (hardlink indisponível)"
+
+        if self.mode == 'move':
+            stat = stat or os.stat(file_path)
+            if stat.st_dev == os.stat(os.path.dirname(dest_path)).st_dev:
+                # os.rename sobrescreveria um nome gravado por outro processo trabalhador
+                rename_no_replace(file_path, dest_path)
+                return f"Arquivo movido para: {dest_path}"
+
+            # Volumes diferentes: copia calculando o hash da origem na mesma leitura,
+            # confere o destino e só então remove a origem
+            source_digest = self._copy(file_path, dest_path, stat, temp_root, with_hash=True)
+            if source_digest != self.comparator.full_hash(dest_path):
+                os.remove(dest_path)
+                raise IOError(f"Verificação falhou ao mover {file_path}")
+            os.remove(file_path)
+            return f"Arquivo movido para: {dest_path}"
+
+        self._copy(file_path, dest_path, stat, temp_root)
+        return f"Arquivo copiado para: {dest_path}"
+
+    def _duplicate_target(self, file_path: str) -> Optional[str]:
+        """Aguarda o arquivo principal do grupo do duplicado e retorna o destino dele."""
+        if self._duplicates is None:
+            return None
+        primary = self._duplicates.primary(file_path)
+        if primary is None:
+            return None
+        with self.metrics.stage('dedupe_wait'):
+            return self._duplicates.wait(primary)
+
+    def _link_duplicate(self, file_path: str, target: str, dest_path: str, stat: Optional[os.stat_result],
+                        temp_root: str) -> Optional[str]:
+        """Grava o duplicado como hardlink ou reflink de `target`; retorna None se não for possível."""
+        kind = self.dedupe
+        try:
+            if kind == 'reflink':
+                if self._reflink_unsupported:
+                    return None
+                temp_path = temp_path_for(temp_root)
+                try:
+                    clone_file(target, temp_path)
+                    commit_temp(temp_path, dest_path)
+                except BaseException:
+                    if os.path.lexists(temp_path):
+                        os.unlink(temp_path)
+                    raise
+            else:
+                os.link(target, dest_path)
+        except FileExistsError:
+            raise
+        except OSError as e:
+            if kind == 'reflink' and e.errno in _REFLINK_UNSUPPORTED:
+                # Sem suporte no sistema de arquivos, não adianta tentar de novo a cada arquivo
+                self._reflink_unsupported = True
+            self.logger.warning(f"Não foi possível criar {kind} de {target} ({str(e)}), gravando {file_path}")
+            return None
+
+        self.metrics.add(f"dedupe_{kind}s")
+        self.metrics.add('dedupe_bytes_saved', (stat or os.stat(file_path)).st_size)
+        if self.mode == 'move':
+            os.remove(file_path)
+        return f"Duplicado de {os.path.basename(target)}, {kind} criado em: {dest_path}"
+
+    def _copy(self, file_path: str, dest_path: str, stat: Optional[os.stat_result], temp_root: str,
+              with_hash: bool = False, replace: bool = False) -> Optional[str]:
+        """Copia para um temporário e o renomeia para o destino; retorna o hash da origem se pedido.
+
+        Com `replace`, o destino existente é substituído; sem ele, FileExistsError é levantado.
+        """
+        temp_path = temp_path_for(temp_root)
+        digest = None
+        try:
+            if with_hash:
+                digest = self.comparator.copy_with_hash(file_path, temp_path, stat)
+            else:
+                copy_file(file_path, temp_path)
+                size = (stat or os.stat(file_path)).st_size
+                self.metrics.add('bytes_read', size)
+                self.metrics.add('bytes_written', size)
+            if replace:
+                os.replace(temp_path, dest_path)
+            else:
+                commit_temp(temp_path, dest_path)
+        except BaseException:
+            if os.path.lexists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return digest
+
+    def file_hash(self, file_path: str, stat: Optional[os.stat_result] = None) -> str:
+        """Gera o hash do arquivo com o algoritmo configurado, reaproveitando o índice persistente.
+
+        Erros de leitura são propagados: um hash vazio faria dois arquivos ilegíveis parecerem iguais.
+        """
         try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
+            return self.comparator.full_hash(file_path, stat)
         except Exception as e:
             self.logger.error(f"Erro ao calcular hash do arquivo {file_path}: {str(e)}")
-            return ""
+            raise
 
     def generate_unique_name(self, path: str) -> str:
-        """Gera um nome único para um arquivo, evitando duplicados."""
-        base, ext = os.path.splitext(path)
-        counter = 1
-        while os.path.exists(path):
-            path = f"{base}_{counter}{ext}"
-            counter += 1
-        return path
\ No newline at end of file
+        """Reserva um nome único para um arquivo, evitando duplicados, sem stat por tentativa."""
+        return self.names.reserve(path)
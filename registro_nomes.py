@@ -0,0 +1,110 @@
+import os
+import threading
+from typing import Dict, Set, Tuple
+
+
+class _DirectoryNames:
+    """Nomes ocupados em uma pasta e o próximo sufixo a tentar para cada nome base."""
+
+    def __init__(self, dir_path: str):
+        self.lock = threading.Lock()
+        self.names: Set[str] = set()
+        self.next_suffix: Dict[Tuple[str, str], int] = {}
+        # Nomes reservados cuja escrita ainda não terminou
+        self.pending: Dict[str, threading.Event] = {}
+        try:
+            with os.scandir(dir_path) as it:
+                self.names.update(os.path.normcase(entry.name) for entry in it)
+        except FileNotFoundError:
+            pass
+
+
+class NameRegistry:
+    """Registro dos nomes ocupados em cada pasta de destino.
+
+    Cada pasta é lida uma única vez com os.scandir e o registro é atualizado
+    à medida que os nomes são reservados, de modo que gerar um nome único não
+    exige uma chamada de stat por tentativa. Um nome reservado fica pendente
+    até commit() ou discard(), e exists() aguarda esse momento. É seguro para
+    uso por várias threads; processos diferentes têm registros independentes.
+    """
+
+    def __init__(self):
+        self._dirs: Dict[str, _DirectoryNames] = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Descarta os nomes conhecidos, forçando uma nova leitura das pastas."""
+        with self._lock:
+            self._dirs.clear()
+
+    def ensure_directory(self, dir_path: str):
+        """Cria a pasta na primeira vez em que ela é usada nesta execução."""
+        if dir_path not in self._dirs:
+            os.makedirs(dir_path, exist_ok=True)
+            self._directory(dir_path)
+
+    def exists(self, path: str) -> bool:
+        """Indica se o nome já está ocupado na pasta, aguardando a escrita em andamento terminar."""
+        dir_path, name = os.path.split(path)
+        directory = self._directory(dir_path)
+        key = os.path.normcase(name)
+        while True:
+            with directory.lock:
+                event = directory.pending.get(key)
+                if event is None:
+                    return key in directory.names
+            event.wait()
+
+    def reserve(self, path: str) -> str:
+        """Reserva o nome, ou o próximo nome livre com sufixo _N, e retorna o caminho reservado."""
+        dir_path, name = os.path.split(path)
+        directory = self._directory(dir_path)
+        with directory.lock:
+            if os.path.normcase(name) not in directory.names:
+                directory.names.add(os.path.normcase(name))
+                directory.pending[os.path.normcase(name)] = threading.Event()
+                return path
+
+            base, ext = os.path.splitext(name)
+            key = (os.path.normcase(base), os.path.normcase(ext))
+            counter = directory.next_suffix.get(key, 1)
+            while os.path.normcase(f"{base}_{counter}{ext}") in directory.names:
+                counter += 1
+            directory.next_suffix[key] = counter + 1
+            unique_name = f"{base}_{counter}{ext}"
+            directory.names.add(os.path.normcase(unique_name))
+            directory.pending[os.path.normcase(unique_name)] = threading.Event()
+            return os.path.join(dir_path, unique_name)
+
+    def commit(self, path: str):
+        """Confirma que o arquivo reservado foi escrito."""
+        self._release(path, keep=True)
+
+    def discard(self, path: str, occupied: bool = False):
+        """Libera um nome reservado que acabou não sendo usado.
+
+        Com `occupied`, o nome continua marcado como ocupado, por exemplo
+        quando outro processo já criou o arquivo.
+        """
+        self._release(path, keep=occupied)
+
+    def _release(self, path: str, keep: bool):
+        dir_path, name = os.path.split(path)
+        directory = self._directory(dir_path)
+        key = os.path.normcase(name)
+        with directory.lock:
+            if not keep:
+                directory.names.discard(key)
+            event = directory.pending.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def _directory(self, dir_path: str) -> _DirectoryNames:
+        directory = self._dirs.get(dir_path)
+        if directory is None:
+            with self._lock:
+                directory = self._dirs.get(dir_path)
+                if directory is None:
+                    directory = self._dirs[dir_path] = _DirectoryNames(dir_path)
+        return directory
@@ -0,0 +1,176 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional
+
+_TOKEN_RE = re.compile(r"[^0-9a-z]+")
+
+# Roteadores já carregados neste processo, por caminho da pasta modelo
+_cache: Dict[str, "ModelRouter"] = {}
+_cache_lock = threading.Lock()
+
+
+def normalize(text: str) -> str:
+    """Remove acentos e converte para minúsculas, para comparar nomes de pastas e arquivos."""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def tokenize(name: str) -> List[str]:
+    """Divide um nome em palavras normalizadas."""
+    return [token for token in _TOKEN_RE.split(normalize(name)) if token]
+
+
+class ModelRouter:
+    """Índice de roteamento construído a partir da estrutura da pasta modelo.
+
+    Cada subpasta do modelo gera duas regras: o nome da pasta (e seu singular)
+    encaminha arquivos cujo nome contém essa palavra, e as extensões dos
+    arquivos presentes nela encaminham arquivos com a mesma extensão. As regras
+    ficam em dicionários, de modo que cada arquivo é roteado com buscas O(1).
+    """
+
+    def __init__(self, model: str, signature: int, name_rules: Dict[str, str], ext_rules: Dict[str, str]):
+        self.model = model
+        self.signature = signature
+        self.name_rules = name_rules
+        self.ext_rules = ext_rules
+
+    @classmethod
+    def build(cls, model: str) -> "ModelRouter":
+        """Percorre a pasta modelo uma vez e monta as regras de roteamento."""
+        name_rules: Dict[str, str] = {}
+        ext_counts: Dict[str, Counter] = {}
+        signature = 0
+
+        # Busca em largura: em caso de empate, vence a pasta mais rasa
+        queue = [(model, "")]
+        while queue:
+            next_queue = []
+            for path, rel in queue:
+                try:
+                    st = os.stat(path)
+                    signature = max(signature, st.st_mtime_ns)
+                    with os.scandir(path) as it:
+                        entries = sorted(it, key=lambda e: e.name)
+                except OSError:
+                    continue
+
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        child_rel = os.path.join(rel, entry.name) if rel else entry.name
+                        next_queue.append((entry.path, child_rel))
+                        for token in cls._folder_tokens(entry.name):
+                            name_rules.setdefault(token, child_rel)
+                    elif rel and entry.is_file():
+                        ext = os.path.splitext(entry.name)[1].lower()
+                        if ext:
+                            ext_counts.setdefault(ext, Counter())[rel] += 1
+            queue = next_queue
+
+        ext_rules = {ext: counts.most_common(1)[0][0] for ext, counts in ext_counts.items()}
+        return cls(model, signature, name_rules, ext_rules)
+
+    @staticmethod
+    def _folder_tokens(folder_name: str) -> List[str]:
+        tokens = []
+        words = tokenize(folder_name)
+        if len(words) == 1:
+            word = words[0]
+            tokens.append(word)
+            if len(word) > 3 and word.endswith("s"):
+                tokens.append(word[:-1])
+        elif words:
+            tokens.append("".join(words))
+        return tokens
+
+    def route(self, file_name: str) -> Optional[str]:
+        """Retorna a subpasta do modelo para o arquivo, ou None se nenhuma regra se aplica."""
+        stem, ext = os.path.splitext(file_name)
+        for token in tokenize(stem):
+            folder = self.name_rules.get(token)
+            if folder is not None:
+                return folder
+        return self.ext_rules.get(ext.lower())
+
+    def to_dict(self) -> dict:
+        return {
+            'model': self.model,
+            'signature': self.signature,
+            'name_rules': self.name_rules,
+            'ext_rules': self.ext_rules
+        }
+
+
+def tree_signature(model: str) -> int:
+    """Calcula o maior mtime entre as pastas do modelo, sem ler o conteúdo dos arquivos."""
+    signature = 0
+    stack = [model]
+    while stack:
+        path = stack.pop()
+        try:
+            signature = max(signature, os.stat(path).st_mtime_ns)
+            with os.scandir(path) as it:
+                stack.extend(e.path for e in it if e.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+    return signature
+
+
+def load_router(model: str, cache_dir: Optional[str] = None,
+                logger: Optional[logging.Logger] = None) -> ModelRouter:
+    """Retorna o roteador da pasta modelo, reconstruindo-o apenas se o mtime da árvore mudou.
+
+    O índice é mantido em memória e, se `cache_dir` for informado, também em
+    um arquivo JSON, para ser reaproveitado entre execuções.
+    """
+    model = os.path.abspath(model)
+    logger = logger or logging.getLogger("FileProcessor")
+    signature = tree_signature(model)
+
+    with _cache_lock:
+        router = _cache.get(model)
+        if router is not None and router.signature == signature:
+            return router
+
+        cache_file = None
+        if cache_dir:
+            key = hashlib.sha1(model.encode("utf-8")).hexdigest()[:16]
+            cache_file = os.path.join(cache_dir, f"rotas_{key}.json")
+            router = _read_cache(cache_file, model, signature)
+
+        if router is None:
+            router = ModelRouter.build(model)
+            logger.info(f"Índice de roteamento do modelo {model}: "
+                        f"{len(router.name_rules)} regras de nome, {len(router.ext_rules)} de extensão")
+            if cache_file:
+                _write_cache(cache_file, router, logger)
+
+        _cache[model] = router
+        return router
+
+
+def _read_cache(cache_file: str, model: str, signature: int) -> Optional[ModelRouter]:
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('model') != model or data.get('signature') != signature:
+        return None
+    return ModelRouter(model, signature, data['name_rules'], data['ext_rules'])
+
+
+def _write_cache(cache_file: str, router: ModelRouter, logger: logging.Logger):
+    try:
+        tmp_file = cache_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(router.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning(f"Não foi possível gravar o cache de roteamento: {str(e)}")
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    """Isola a pasta de logs, índices e diários do processador em uma pasta temporária."""
+    import processador
+    path = tmp_path / "logs"
+    monkeypatch.setattr(processador, "LOG_DIR", str(path))
+    return path
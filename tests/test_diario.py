@@ -0,0 +1,25 @@
+from diario import JobJournal
+
+
+def test_finished_journal_is_removed(tmp_path):
+    journal = JobJournal.create(str(tmp_path), {'sources': []})
+    journal.started("/a")
+    journal.done("/a", 'success', "/dst/a")
+    journal.finish()
+
+    assert not (tmp_path / "trabalhos" / journal.path.rsplit("/", 1)[-1]).exists()
+    assert JobJournal.find_unfinished(str(tmp_path)) is None
+
+
+def test_interrupted_journal_resumes_completed_files(tmp_path):
+    journal = JobJournal.create(str(tmp_path), {'sources': ["/src"]})
+    journal.started("/a")
+    journal.done("/a", 'success', "/dst/a")
+    journal.started("/b")
+    journal.close()
+
+    path = JobJournal.find_unfinished(str(tmp_path))
+    resumed = JobJournal.resume(path)
+    assert resumed.params == {'sources': ["/src"]}
+    assert resumed.is_completed("/a") and not resumed.is_completed("/b")
+    resumed.close()
@@ -0,0 +1,39 @@
+import os
+
+from indice_hash import HashIndex
+
+
+def test_pending_writes_do_not_lock_other_connections(tmp_path):
+    path = str(tmp_path / "indice.sqlite3")
+    st = os.stat(tmp_path)
+    first = HashIndex(path, timeout=0.5)
+    second = HashIndex(path, timeout=0.5)
+
+    # Uma escrita ainda não gravada não pode segurar o banco para os outros processos
+    first.put("/a", st, "hash-a")
+    second.put("/b", st, "hash-b")
+    second.flush()
+    first.close()
+    second.close()
+
+    reopened = HashIndex(path)
+    assert reopened.get("/a", st) == "hash-a"
+    assert reopened.get("/b", st) == "hash-b"
+    reopened.close()
+
+
+def test_stale_entry_is_removed(tmp_path):
+    path = str(tmp_path / "indice.sqlite3")
+    index = HashIndex(path)
+    st = os.stat(tmp_path)
+    index.put("/a", st, "hash-a")
+    index.flush()
+
+    changed = os.stat_result((st.st_mode, st.st_ino, st.st_dev, st.st_nlink, st.st_uid, st.st_gid,
+                              st.st_size + 1, st.st_atime, st.st_mtime, st.st_ctime))
+    assert index.get("/a", changed) is None
+    index.close()
+
+    reopened = HashIndex(path)
+    assert reopened.get("/a", st) is None
+    reopened.close()
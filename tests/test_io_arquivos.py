@@ -0,0 +1,53 @@
+import errno
+
+import pytest
+
+import io_arquivos
+from io_arquivos import rename_no_replace
+
+
+def _no_link(*args, **kwargs):
+    raise OSError(errno.EPERM, "hardlinks não suportados")
+
+
+@pytest.fixture(params=["renameat2", "link", "placeholder"])
+def strategy(request, monkeypatch):
+    """Exercita cada caminho de rename_no_replace, desligando os anteriores."""
+    if request.param != "renameat2":
+        monkeypatch.setattr(io_arquivos, "_renameat2", False)
+    if request.param == "placeholder":
+        monkeypatch.setattr(io_arquivos.os, "link", _no_link)
+    return request.param
+
+
+def test_rename_no_replace_moves(tmp_path, strategy):
+    src, dst = tmp_path / "a", tmp_path / "b"
+    src.write_text("novo")
+
+    rename_no_replace(str(src), str(dst))
+
+    assert not src.exists()
+    assert dst.read_text() == "novo"
+
+
+def test_rename_no_replace_keeps_existing(tmp_path, strategy):
+    src, dst = tmp_path / "a", tmp_path / "b"
+    src.write_text("novo")
+    dst.write_text("antigo")
+
+    with pytest.raises(FileExistsError):
+        rename_no_replace(str(src), str(dst))
+
+    assert src.read_text() == "novo"
+    assert dst.read_text() == "antigo"
+
+
+def test_commit_temp_never_overwrites(tmp_path, strategy):
+    temp, dst = tmp_path / "copia.part", tmp_path / "b"
+    temp.write_text("novo")
+    dst.write_text("gravado por outro processo")
+
+    with pytest.raises(FileExistsError):
+        io_arquivos.commit_temp(str(temp), str(dst))
+
+    assert dst.read_text() == "gravado por outro processo"
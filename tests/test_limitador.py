@@ -0,0 +1,27 @@
+import multiprocessing
+
+from limitador import RateLimiter
+
+
+def _follow_and_report(shared, changed, reports):
+    limiter = RateLimiter()
+    limiter.follow(shared)
+    reports.put((limiter.active, limiter.limits()))
+    changed.wait(10)
+    reports.put((limiter.active, limiter.limits()))
+
+
+def test_worker_process_follows_limit_changes():
+    leader = RateLimiter(bytes_per_second=4 * 1024 * 1024)
+    shared = leader.share(2)
+    changed = multiprocessing.Event()
+    reports = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=_follow_and_report, args=(shared, changed, reports))
+    worker.start()
+    try:
+        assert reports.get(timeout=10) == (True, {'bytes_per_second': 2 * 1024 * 1024, 'files_per_second': 0.0})
+        leader.set_limits(bytes_per_second=0, files_per_second=10)
+        changed.set()
+        assert reports.get(timeout=10) == (True, {'bytes_per_second': 0.0, 'files_per_second': 5.0})
+    finally:
+        worker.join(10)
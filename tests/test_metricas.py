@@ -0,0 +1,13 @@
+from metricas import RunMetrics
+
+
+def test_summary_shows_wrapping_stage_as_total():
+    metrics = RunMetrics()
+    metrics.record('process', 0.5)
+    metrics.record('transfer', 0.3)
+    metrics.record('compare', 0.1)
+
+    text = metrics.summary_text()
+
+    assert text.startswith("total por arquivo: 0.5s | transfer: 0.3s | compare: 0.1s")
+    assert "process:" not in text
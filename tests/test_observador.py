@@ -0,0 +1,32 @@
+import os
+import time
+
+from manifesto import RunManifest
+from observador import FolderWatcher
+
+
+def test_reconcile_skips_files_unchanged_in_manifest(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    for name in ("antigo.txt", "novo.txt"):
+        (source / name).write_text(name)
+        os.utime(source / name, ns=(10**9, 10**9))
+    manifest = RunManifest(str(tmp_path / "manifesto.sqlite3"))
+    manifest.record(str(source / "antigo.txt"), os.stat(source / "antigo.txt"), "/dst/antigo.txt")
+    manifest.save()
+
+    watcher = FolderWatcher([str(source)], reconcile_interval=0.5,
+                            manifest=RunManifest(str(tmp_path / "manifesto.sqlite3")))
+    delivered = []
+    deadline = time.monotonic() + 2
+    for entry in watcher:
+        if entry is not None:
+            delivered.append(os.path.basename(entry.path))
+        if time.monotonic() > deadline:
+            break
+    watcher.stop()
+    manifest.close()
+
+    # Sem processador registrando no manifesto, o novo reaparece a cada passada; o inalterado, nunca
+    assert "novo.txt" in delivered
+    assert "antigo.txt" not in delivered
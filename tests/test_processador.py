@@ -0,0 +1,189 @@
+import os
+import pstats
+import threading
+
+from processador import FileProcessor, FileScanner
+
+
+def _colliding_sources(root, count):
+    """Cria `count` origens, cada uma com um same.txt de conteúdo diferente."""
+    sources = []
+    for i in range(count):
+        source = root / f"s{i}"
+        source.mkdir()
+        (source / "same.txt").write_text(f"conteudo {i}")
+        sources.append(str(source))
+    return sources
+
+
+def _run(processor, sources, destination, **kwargs):
+    results = list(processor.process_entries(FileScanner(sources), None, destination, **kwargs))
+    processor.close()
+    return [result for _, result in results]
+
+
+def test_move_with_processes_never_overwrites(tmp_path, log_dir):
+    sources = _colliding_sources(tmp_path, 40)
+    destination = str(tmp_path / "dst")
+    processor = FileProcessor(use_hash_index=False, mode='move')
+
+    results = _run(processor, sources, destination, workers=8, use_processes=True)
+
+    assert [r['status'] for r in results] == ['success'] * 40
+    written = sorted(os.listdir(destination))
+    assert len(written) == 40
+    contents = {(tmp_path / "dst" / name).read_text() for name in written}
+    assert contents == {f"conteudo {i}" for i in range(40)}
+
+
+def test_copy_with_processes_shares_hash_index(tmp_path, log_dir):
+    sources = _colliding_sources(tmp_path, 40)
+    destination = str(tmp_path / "dst")
+    processor = FileProcessor(hash_index_path=str(tmp_path / "indice.sqlite3"))
+
+    results = _run(processor, sources, destination, workers=8, use_processes=True)
+
+    assert [r['status'] for r in results] == ['success'] * 40
+    assert len(os.listdir(destination)) == 40
+
+
+def test_names_taken_by_other_workers_get_plain_suffixes(tmp_path, log_dir):
+    sources = _colliding_sources(tmp_path, 10)
+    destination = str(tmp_path / "dst")
+    _run(FileProcessor(use_hash_index=False), sources, destination, workers=4, use_processes=True)
+
+    # Segunda passada: cada processo conhece só os nomes da sua leitura da pasta
+    more = tmp_path / "mais"
+    more.mkdir()
+    for i in range(10):
+        (more / f"m{i}").mkdir()
+        (more / f"m{i}" / "same.txt").write_text(f"outro {i}")
+    _run(FileProcessor(use_hash_index=False), [str(more / f"m{i}") for i in range(10)], destination,
+         workers=4, use_processes=True)
+
+    names = os.listdir(destination)
+    assert len(names) == 20
+    assert all(name.count("_") <= 1 for name in names)
+
+
+def test_incremental_replaces_changed_file(tmp_path, log_dir):
+    source = tmp_path / "src"
+    source.mkdir()
+    report = source / "report.txt"
+    destination = str(tmp_path / "dst")
+
+    for version in range(1, 4):
+        report.write_text("v" * version)
+        os.utime(report, ns=(version * 10**9, version * 10**9))
+        results = _run(FileProcessor(use_hash_index=False, incremental=True), [str(source)], destination)
+        assert results[0]['status'] == 'success'
+
+    assert os.listdir(destination) == ["report.txt"]
+    assert (tmp_path / "dst" / "report.txt").read_text() == "vvv"
+
+
+def test_cancel_stops_duplicate_grouping(tmp_path, log_dir, monkeypatch):
+    import deduplicador
+    monkeypatch.setattr(deduplicador, "PROGRESS_INTERVAL", 0)
+    source = tmp_path / "src"
+    source.mkdir()
+    for i in range(50):
+        (source / f"f{i}.bin").write_bytes(b"x" * 1000)
+    processor = FileProcessor(use_hash_index=False, dedupe='hardlink')
+    cancel_event = threading.Event()
+    reports = []
+
+    def progress(stage, done, total):
+        reports.append((stage, done, total))
+        cancel_event.set()
+
+    results = _run(processor, [str(source)], str(tmp_path / "dst"), workers=1,
+                   cancel_event=cancel_event, progress=progress)
+
+    assert results == []
+    assert len(reports) == 1 and reports[0][1] < reports[0][2]
+    assert processor.run_summary['dedupe']['groups'] == 0
+
+
+def test_resume_restores_hash_algorithm(tmp_path, log_dir):
+    original = FileProcessor(use_hash_index=False, hash_algorithm='blake2b', mode='hardlink')
+    original.create_journal([str(tmp_path)], None, str(tmp_path / "dst")).close()
+
+    processor = FileProcessor(use_hash_index=False)
+    processor.resume_journal().close()
+
+    assert processor.mode == 'hardlink'
+    assert processor.hash_algorithm == processor.comparator.algorithm == 'blake2b'
+
+
+def test_destination_inside_source_is_not_scanned(tmp_path, log_dir):
+    from planejador import build_plan
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    for i in range(5):
+        (source / "sub" / f"f{i}").write_text(str(i))
+    destination = str(source / "out")
+    processor = FileProcessor(use_hash_index=False, dedupe='hardlink', hash_algorithm='blake2b')
+
+    for _ in range(2):
+        processed = list(processor.process_entries(processor.scan_files([str(source)], destination),
+                                                   None, destination))
+        assert len(processed) == 5
+    plan = build_plan(processor, [str(source)], None, destination)
+    processor.close()
+
+    assert plan.discovered == 5
+    assert not (source / "out" / "out").exists()
+    assert plan.params['dedupe'] == 'hardlink' and plan.params['hash_algorithm'] == 'blake2b'
+
+
+def test_plan_replay_uses_current_stat(tmp_path, log_dir):
+    from planejador import RunPlan, build_plan
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "f.txt").write_text("AAAA")
+    (source / "gone.txt").write_text("x")
+    destination = str(tmp_path / "dst")
+    processor = FileProcessor(hash_index_path=str(tmp_path / "indice.sqlite3"))
+    list(processor.process_entries(processor.scan_files([str(source)], destination), None, destination))
+
+    plan_path = str(tmp_path / "plano.jsonl")
+    build_plan(processor, [str(source)], None, destination).save(plan_path)
+    (source / "f.txt").write_text("BBBB")
+    os.utime(source / "f.txt", ns=(10**9, 10**9))
+    os.remove(source / "gone.txt")
+    plan = RunPlan.load(plan_path)
+    results = list(processor.process_entries(plan, None, destination))
+    processor.close()
+
+    assert [(entry.name, result['status']) for entry, result in results] == [("f.txt", 'success')]
+    assert plan.drift == {'changed': 1, 'missing': 1}
+    assert (tmp_path / "dst" / "f_1.txt").read_text() == "BBBB"
+
+
+def test_identical_files_with_processes_are_written_once(tmp_path, log_dir):
+    sources = []
+    for i in range(8):
+        source = tmp_path / f"s{i}"
+        source.mkdir()
+        (source / "same.txt").write_text("mesmo conteúdo")
+        sources.append(str(source))
+    destination = str(tmp_path / "dst")
+
+    results = _run(FileProcessor(use_hash_index=False), sources, destination, workers=4, use_processes=True)
+
+    assert sorted(r['status'] for r in results) == ['skipped'] * 7 + ['success']
+    assert os.listdir(destination) == ["same.txt"]
+
+
+def test_profile_with_processes_merges_worker_stats(tmp_path, log_dir):
+    sources = _colliding_sources(tmp_path, 6)
+    destination = str(tmp_path / "dst")
+
+    _run(FileProcessor(use_hash_index=False, profile=True), sources, destination, workers=3, use_processes=True)
+
+    profiles = [name for name in os.listdir(log_dir) if name.startswith("perfil_")]
+    assert len(profiles) == 1 and profiles[0].endswith(".prof")
+    stats = pstats.Stats(str(log_dir / profiles[0]))
+    calls = sum(nc for (_, _, name), (_, nc, _, _, _) in stats.stats.items() if name == "process_file")
+    assert calls == 6
@@ -0,0 +1,22 @@
+import glob
+import os
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from benchmark import STARTUP_TARGET, measure_startup
+
+
+def _offscreen_available():
+    plugins = QtCore.QLibraryInfo.location(QtCore.QLibraryInfo.PluginsPath)
+    return bool(glob.glob(os.path.join(plugins, "platforms", "*qoffscreen*")))
+
+
+@pytest.mark.skipif(not _offscreen_available(), reason="plataforma offscreen do Qt indisponível")
+def test_gui_cold_start_within_target():
+    result = measure_startup(runs=3)
+
+    assert 'error' not in result, result.get('error')
+    assert result['eager_modules'] == []
+    assert result['total_s'] <= STARTUP_TARGET